@@ -0,0 +1,308 @@
+"""
+Microbenchmarks of the targeting, placement, skill, game flow and rendering hot paths.
+Every benchmark sets up a game from a fixed seed and times one operation in isolation.
+Results can be written as JSON and compared against a stored baseline to flag regressions.
+Usage:
+    python benchmarks/micro.py --json baseline.json
+    python benchmarks/micro.py --compare baseline.json --threshold 0.25
+"""
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # Images and fonts are loaded relative to the project folder.
+os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import logging as lg
+import random as rd
+import numpy as np
+import pygame as pg
+import bsheadless as hl
+import bsmain as bs
+import bsgui as ui
+import gamerbase as gb
+from gamerbase import GameState as State
+
+SEED = 2024
+MIN_TIME = 0.02  # seconds per repeat of a benchmark that can be looped
+FRESH_CALLS = 50  # calls per repeat of a benchmark that needs a new setup for every call
+BENCHMARKS = {}
+
+
+def benchmark(name: str, fresh=False):
+    """
+    Registers a benchmark. The decorated function sets up a game from a random number generator
+    and returns the operation to time. With fresh=True the operation changes the game,
+    so every call is timed on a new setup.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, fresh)
+        return setup
+    return register
+
+
+def mid_game(rng: rd.Random, shots=30, level=3) -> tuple[list[bs.Board], list[list]]:
+    """
+    Returns the boards and fleets of a game after up to 'shots' Comp shots at each board.
+    Firing at a board stops while it has one ship afloat.
+    """
+    boards, fleets = hl.new_game((level, level), rng=rng)
+    for _ in range(shots):
+        for board in boards:
+            if sum(not ship.sunk for ship in board.player.fleet.values()) > 1:
+                bs.fire(board, comp_fire=level)
+    # Leave at least one ship damaged but afloat, so the follow-up paths have a hit to work from.
+    for board in boards:
+        if not board.state.hits & ~board.state.sunk:
+            ship = next(ship for ship in board.player.fleet.values() if not ship.sunk)
+            bs.fire(board, target=next(t for t in ship.position if not board.state.is_checked(t.index)))
+    return boards, fleets
+
+
+def open_hit(board: bs.Board) -> bs.Target:
+    return board.targets_in(board.state.hits & ~board.state.sunk)[0]
+
+
+def afloat(board: bs.Board, ship_type: str) -> bs.vs.Vessel:
+    return board.player.fleet[ship_type]
+
+
+# ----- Targeting -----
+
+for _level in (1, 2, 3, 4):
+    @benchmark(f'comp_target[level={_level}]')
+    def _comp_target(rng, level=_level):
+        board = mid_game(rng, level=level)[0][0]
+        board.target_locked = True
+        return lambda: board.comp_target(level)
+
+
+@benchmark('search_target')
+def _search_target(rng):
+    board = mid_game(rng)[0][0]
+    return lambda: board.search_target(3)
+
+
+@benchmark('calculate_target')
+def _calculate_target(rng):
+    board = mid_game(rng)[0][0]
+    coord = open_hit(board).coord
+    return lambda: board.calculate_target(coord, rand_dir=True)
+
+
+# ----- Placement -----
+
+@benchmark('place_random[fleet]', fresh=True)
+def _place_random(rng):
+    player = gb.Comp(rng=rng)
+    board = bs.Board(player)
+    board.init_targets()
+    fleet = bs.deploy_fleet(board, player)
+    return lambda: bs.place_random(board, fleet)
+
+
+# ----- Skills -----
+# The skill functions are called directly, without the roll for success.
+
+@benchmark('skill[em_railgun]', fresh=True)
+def _em_railgun(rng):
+    boards, _ = mid_game(rng)
+    carrier = afloat(boards[1], 'Carrier')
+    origin = boards[0].state.unchecked()[0]
+    return lambda: bs.Special.em_railgun(carrier.special, boards[0], boards[0].targets[origin])
+
+
+@benchmark('skill[missile_salvo]', fresh=True)
+def _missile_salvo(rng):
+    boards, _ = mid_game(rng)
+    cruiser = afloat(boards[1], 'Cruiser')
+    origin = boards[0].targets[boards[0].state.unchecked()[0]]
+    return lambda: bs.Special.missile_salvo(cruiser.special, boards[0], origin)
+
+
+@benchmark('skill[depth_charge]', fresh=True)
+def _depth_charge(rng):
+    boards, _ = mid_game(rng)
+    frigate = afloat(boards[1], 'Frigate')
+    target = boards[0].targets[boards[0].state.unchecked()[0]]
+    return lambda: bs.Special.depth_charge(frigate.special, boards[0], target)
+
+
+@benchmark('skill[sonar_blast]', fresh=True)
+def _sonar_blast(rng):
+    boards, _ = mid_game(rng, shots=5)
+    destroyer = afloat(boards[0], 'Destroyer')
+    return lambda: bs.Special.sonar_blast(destroyer.special, boards[0])
+
+
+@benchmark('skill[countermeasures]', fresh=True)
+def _countermeasures(rng):
+    boards, _ = mid_game(rng, shots=5)
+    submarine = afloat(boards[0], 'Submarine')
+    return lambda: bs.Special.countermeasures(submarine.special, boards[0])
+
+
+# ----- Game flow -----
+
+@benchmark('progress_flow')
+def _progress_flow(rng):
+    game = gb.GameFlow()
+    game.progress_flow(start=State.PLAY)
+    return game.progress_flow
+
+
+# ----- Rendering -----
+
+@benchmark('frame[draw_grids+DisplayData.draw]')
+def _frame(rng):
+    ui.Display.HEADLESS = False
+    ui.init()
+    boards, _ = mid_game(rng)
+    grid_data = [boards[0].grid, boards[1].grid, boards[0].headers, boards[1].headers]
+
+    def frame():
+        ui.Pointer.update()
+        ui.draw_grids(*grid_data)
+        ui.DisplayData.draw()
+        ui.Frame.update()
+    return frame
+
+
+# ----- Runner -----
+
+def run(name: str, repeats=7, seed=SEED) -> dict:
+    """
+    Returns the median and fastest time per call in microseconds, and the number of calls timed.
+    The garbage collector is paused while timing, as in timeit.
+    """
+    setup, fresh = BENCHMARKS[name]
+    timer = time.perf_counter
+    times = []
+    calls = 0
+    if fresh:
+        for r in range(repeats):
+            elapsed = 0.0
+            for n in range(FRESH_CALLS):
+                operation = setup(rd.Random(seed + r * FRESH_CALLS + n))
+                gc.disable()
+                start = timer()
+                operation()
+                elapsed += timer() - start
+                gc.enable()
+                reset()
+            times.append(elapsed / FRESH_CALLS)
+            calls += FRESH_CALLS
+    else:
+        operation = setup(rd.Random(seed))
+        gc.collect()
+        gc.disable()
+        number = 1
+        while True:  # Calibrate the number of calls per repeat.
+            start = timer()
+            for _ in range(number):
+                operation()
+            if timer() - start >= MIN_TIME:
+                break
+            number *= 2
+        for _ in range(repeats):
+            start = timer()
+            for _ in range(number):
+                operation()
+            times.append((timer() - start) / number)
+            calls += number
+        gc.enable()
+        reset()
+    return {'median_us': statistics.median(times) * 1e6, 'min_us': min(times) * 1e6, 'calls': calls}
+
+
+def reset():
+    """Releases the players and shared state of the last setup."""
+    for player in list(gb.Player.LIST):
+        gb.Player.remove_player(player)
+    ui.DisplayData.IMAGES.clear()
+    ui.DisplayData.POSITIONS.clear()
+    ui.Display.HEADLESS = True
+
+
+def measure(names, repeats=7, seed=SEED) -> dict:
+    results = {}
+    for name in names:
+        results[name] = run(name, repeats, seed)
+        print(f'{name:<36} {results[name]["median_us"]:>12.1f} us  (min {results[name]["min_us"]:.1f})')
+    return results
+
+
+def metadata() -> dict:
+    return {'python': platform.python_version(),
+            'pygame': pg.version.ver,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'system': platform.system(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+
+
+def compare(results: dict, baseline: dict, threshold=0.25) -> list[str]:
+    """Prints the change of each median against the baseline. Returns the names of the regressions."""
+    regressions = []
+    print(f'\n{"benchmark":<36} {"baseline us":>12} {"current us":>12} {"change":>8}')
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f'{name:<36} {"-":>12} {result["median_us"]:>12.1f}      new')
+            continue
+        change = result['median_us'] / base['median_us'] - 1
+        flag = ''
+        if change > threshold:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = 'improved'
+        print(f'{name:<36} {base["median_us"]:>12.1f} {result["median_us"]:>12.1f} {change:>+8.1%} {flag}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the microbenchmarks.')
+    parser.add_argument('-k', '--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('-r', '--repeats', type=int, default=7)
+    parser.add_argument('-s', '--seed', type=int, default=SEED)
+    parser.add_argument('--json', metavar='PATH', help='write the results to a JSON file')
+    parser.add_argument('--compare', metavar='PATH', help='compare against the results in a JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown of a median reported as a regression (default 0.25)')
+    parser.add_argument('-l', '--list', action='store_true', help='list the benchmarks')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return
+
+    hl.configure()
+    lg.getLogger().setLevel(lg.WARNING)
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = measure(names, args.repeats, args.seed)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'meta': metadata(), 'seed': args.seed, 'results': results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%}: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
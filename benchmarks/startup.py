@@ -0,0 +1,91 @@
+"""
+Startup latency of the game modules.
+Every sample runs in a fresh interpreter, as a test or simulation worker would, and reports
+the time to import a module and, for the game, the time until its first frame is drawn.
+Usage: python benchmarks/startup.py --runs 10 --json startup.json
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SAMPLE = '''
+import json, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{'import': time.perf_counter() - start}}))
+'''
+
+FRAME_SAMPLE = '''
+import json, time, logging
+start = time.perf_counter()
+import bsmain as bs
+imported = time.perf_counter()
+logging.disable(logging.INFO)
+
+bs.ui.init()
+boards = []
+for player, grid_pos in ((bs.gb.Player(), (bs.ui.Display.WIDTH / 2 + 80, 100)), (bs.gb.Comp(), (70, 100))):
+    board = bs.Board(player)
+    board.init_targets(sqr_size=45, grid_pos=grid_pos)
+    bs.place_random(board, bs.deploy_fleet(board, player))
+    boards.append(board)
+bs.ui.draw_grids(boards[0].grid, boards[1].grid, boards[0].headers, boards[1].headers)
+bs.ui.DisplayData.draw()
+bs.ui.Frame.update()
+print(json.dumps({'import': imported - start, 'frame': time.perf_counter() - imported}))
+'''
+
+SAMPLES = {'pygame': IMPORT_SAMPLE.format(module='pygame'),
+           'bsstate': IMPORT_SAMPLE.format(module='bsstate'),
+           'bsmain': IMPORT_SAMPLE.format(module='bsmain'),
+           'bsheadless': IMPORT_SAMPLE.format(module='bsheadless'),
+           'first frame': FRAME_SAMPLE
+           }
+
+
+def sample(code: str) -> dict:
+    """Runs the code in a new interpreter. Returns its timings and the wall time of the whole process."""
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings['process'] = time.perf_counter() - start
+    return timings
+
+
+def measure(runs=10) -> dict:
+    """Returns {sample: {timing: {'median': ms, 'min': ms}}} over the given number of runs."""
+    results = {}
+    for name, code in SAMPLES.items():
+        samples = [sample(code) for _ in range(runs)]
+        results[name] = {timing: {'median': statistics.median(s[timing] for s in samples) * 1000,
+                                  'min': min(s[timing] for s in samples) * 1000}
+                         for timing in samples[0]}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import and first-frame latency.')
+    parser.add_argument('-n', '--runs', type=int, default=10)
+    parser.add_argument('--json', metavar='PATH', help='also write the results to a JSON file')
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    print(f'{"sample":<12} {"timing":<8} {"median ms":>10} {"min ms":>8}')
+    for name, timings in results.items():
+        for timing, ms in timings.items():
+            print(f'{name:<12} {timing:<8} {ms["median"]:>10.1f} {ms["min"]:>8.1f}')
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,68 @@
 from typing import Union
-from inspect import getmembers
+from collections import OrderedDict
+import numpy as np
 import pygame as pg
-pg.font.init()
+
+
+class Fonts:
+    """Registry of loaded fonts. Each font file is read once per size."""
+    LOADED: dict[tuple[str, int], pg.font.Font] = {}
+
+    @classmethod
+    def get(cls, name: str, size: int) -> pg.font.Font:
+        font = cls.LOADED.get((name, size))
+        if font is None:
+            if not pg.font.get_init():
+                pg.font.init()
+            font = cls.LOADED[(name, size)] = pg.font.Font(name, size)
+        return font
+
+
+class TextCache:
+    """
+    Least-recently-used cache of rendered text surfaces, keyed by (text, font, size, color, background).
+    Oldest surfaces are evicted once the cache exceeds MAX_BYTES of pixel data.
+    """
+    MAX_BYTES = 8 * 1024 * 1024
+    SURFACES: OrderedDict[tuple, pg.Surface] = OrderedDict()
+    BYTES = 0
+
+    @classmethod
+    def render(cls, text: str, font: str, size: int, color, background=None) -> pg.Surface:
+        key = (text, font, size, color, background)
+        surface = cls.SURFACES.get(key)
+        if surface is not None:
+            cls.SURFACES.move_to_end(key)
+            return surface
+
+        surface = Fonts.get(font, size).render(text, True, color, background)
+        cls.SURFACES[key] = surface
+        cls.BYTES += cls.bytes(surface)
+        while cls.BYTES > cls.MAX_BYTES and len(cls.SURFACES) > 1:
+            _, evicted = cls.SURFACES.popitem(last=False)
+            cls.BYTES -= cls.bytes(evicted)
+        return surface
+
+    @staticmethod
+    def bytes(surface: pg.Surface) -> int:
+        return surface.get_pitch() * surface.get_height()
+
+    @classmethod
+    def clear(cls):
+        cls.SURFACES.clear()
+        cls.BYTES = 0
 
 
 class Display:
-    """This class contains settings for the display window."""
+    """This class contains settings for the display window. The window is opened by init()."""
     WIDTH, HEIGHT = 1200, 800
-    WINDOW = pg.display.set_mode((WIDTH, HEIGHT))
-    BACKGROUND = pg.image.load('Images/ocean2.jpg')
-    BACK_POS = (WIDTH//2 - BACKGROUND.get_width()//2, HEIGHT//2 - BACKGROUND.get_height()//2)
+    CAPTION = 'Project BattleShip'
+    WINDOW: pg.Surface = None
+    BACKGROUND: pg.Surface = None
+    BACKGROUND_FILE = 'Images/ocean2.jpg'
+    BACK_POS = (0, 0)
+    ICON_FILE = 'Images/battleship.png'
     WIN_COLOR = (20, 70, 180)  # ROYAL BLUE
-    pg.display.set_caption('Project BattleShip')
-    pg.display.set_icon(pg.image.load('Images/battleship.png'))
 
     RGB_DARK_BLUE = (0, 20, 75)
     RGB_GREEN = (150, 255, 0)
@@ -22,11 +72,12 @@ class Display:
     RGB_BLACK = (0, 0, 0)
 
     FONT_NAME = 'Fonts/Nau Sea.otf'
-    FONT = pg.font.Font(FONT_NAME, 20)
+    FONT_SIZE = 20
     FONT_COLOR = RGB_WHITE
 
     FPS = 30
     FRAME = 0
+    HEADLESS = False  # Skip window updates for simulated games.
     EXPAND_ROW = False
     EXPAND_COL = False
 
@@ -37,20 +88,53 @@ class MessageBox:
                  position=(0.0, 0.0),
                  text='',
                  font=Display.FONT_NAME,
-                 size=20,
+                 size=Display.FONT_SIZE,
                  color=Display.FONT_COLOR,
-                 background=None
+                 background=None,
+                 align: tuple[bool, bool] = None
                  ):
         self.position = position
-        self.text = text
+        self._text = text
         self._font = font
         self._size = size
         self.color = color
         self.background = background
+        # Centered (horizontally, vertically) in the window by layout(), if set.
+        self.align = align
+        # Text or font changed since the last layout.
+        self.dirty = True
+        # Last rendering shown in the window (see Frame).
+        self.rect = pg.Rect(0, 0, 0, 0)
+        self._rendered = None
+        self._surface = None
 
     def draw(self):
-        message = self.font.render(self.text, True, self.color, self.background)
-        Display.WINDOW.blit(message, self.position)
+        Display.WINDOW.blit(self.render(), self.position)
+
+    def render(self) -> pg.Surface:
+        return TextCache.render(self.text, self._font, self._size, self.color, self.background)
+
+    def refresh(self):
+        """Re-renders the message only if its text, style or position changed. Marks the change for redrawing."""
+        rendered = (self.text, self.color, self.background, self._font, self._size, tuple(self.position))
+        if rendered != self._rendered:
+            Frame.mark(self.rect)
+            self._rendered = rendered
+            self._surface = self.render()
+            self.rect = self._surface.get_rect(topleft=self.position)
+            Frame.mark(self.rect)
+
+    def blit(self):
+        """Draws the last rendering of the message."""
+        if self._surface is not None:
+            Display.WINDOW.blit(self._surface, self.rect)
+
+    def layout(self):
+        """Re-centers the message only if its text or font changed since the last layout."""
+        if self.dirty:
+            if self.align:
+                self.center(horiz=self.align[0], vert=self.align[1])
+            self.dirty = False
 
     def center(self, over_rect: pg.Rect=None, horiz=True, vert=True):
         x, y = self.position
@@ -69,14 +153,26 @@ class MessageBox:
         self.position = (new_x, new_y)
 
     def change_font(self, name='', size=0):
-        if name:
+        if name and name != self._font:
             self._font = name
-        if size > 0:
+            self.dirty = True
+        if size > 0 and size != self._size:
             self._size = size
+            self.dirty = True
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, text: str):
+        if text != self._text:
+            self._text = text
+            self.dirty = True
 
     @property
     def font(self) -> pg.font.Font:
-        return pg.font.Font(self._font, self._size)
+        return Fonts.get(self._font, self._size)
 
     @property
     def size(self) -> int:
@@ -93,26 +189,168 @@ class Box(pg.Rect):
         self.color1 = Display.RGB_DARK_BLUE
         self.color2 = None
         self.color3 = None
+        self.style = None  # (color, border width) last drawn in the window
+
+    def draw(self):
+        if self.style is None:
+            return
+        color, width = self.style
+        pg.draw.rect(Display.WINDOW, color, self, width, 10, 10, 10, 10)
 
     def __repr__(self):
         return f'{self.__class__.__name__} {self.name}'
 
 
+class Grid(list):
+    """
+    The Boxes of a square board in cell order, with the layout they were placed in.
+    The Box at a window position is calculated from the origin and pitch, so finding it
+    does not grow with the size of the board. Rows and columns are indexed once for highlighting.
+    """
+    def __init__(self, boxes: list[Box], pitch: int, size: int):
+        super().__init__(boxes)
+        self.origin = boxes[0].topleft if boxes else (0, 0)
+        self.pitch = pitch  # Box size plus the gap between boxes.
+        self.size = size  # Boxes per row and column.
+        self.rows = tuple(tuple(self[y * size:(y + 1) * size]) for y in range(size))
+        self.columns = tuple(tuple(self[x::size]) for x in range(size))
+        self.group: tuple[Box, ...] = ()  # Row or column last activated. See activate_group.
+
+    def coord_at(self, pos: tuple[int, int]) -> tuple[int, int]:
+        """Returns the column, row of the Box under a window position, or None outside the grid or between boxes."""
+        x, y = (int((p - origin) // self.pitch) for p, origin in zip(pos, self.origin))
+        if 0 <= x < self.size and 0 <= y < self.size and self[y * self.size + x].collidepoint(pos):
+            return x, y
+
+    def index_at(self, pos: tuple[int, int]) -> int:
+        """Returns the cell of the Box under a window position, or None."""
+        coord = self.coord_at(pos)
+        return coord[1] * self.size + coord[0] if coord is not None else None
+
+    def box_at(self, pos: tuple[int, int]) -> Box:
+        index = self.index_at(pos)
+        return self[index] if index is not None else None
+
+
+class Pointer:
+    """
+    The mouse position, read once per frame by update(), and the grid Box under it.
+    Everything drawn or selected in a frame tests against the same position.
+    """
+    POS = (0, 0)
+    BOX: Box = None  # Box under the mouse in the grids last drawn, if any.
+    GRIDS: tuple[Grid, ...] = ()  # Set by draw_grids.
+
+    @classmethod
+    def update(cls, pos: tuple[int, int] = None):
+        cls.POS = pg.mouse.get_pos() if pos is None else pos
+        cls.locate()
+
+    @classmethod
+    def locate(cls):
+        cls.BOX = None
+        for grid in cls.GRIDS:
+            cls.BOX = grid.box_at(cls.POS)
+            if cls.BOX is not None:
+                return
+
+
+class Viewport:
+    """
+    Scrolling, zooming view of a large board, drawn in place of the grid boxes.
+    Cells are drawn as squares of 'pitch' pixels. Only the cells in view are drawn,
+    so drawing and mouse-testing do not grow with the size of the board.
+    """
+    MIN_PITCH = 2
+    MAX_PITCH = 45
+    LINE_PITCH = 6  # Cells are separated by gridlines from this pitch up.
+    LINE_COLOR = Display.WIN_COLOR
+    HOVER_COLOR = Display.RGB_YELLOW
+
+    def __init__(self, rect: tuple[float, float, float, float], grid_size: int):
+        self.rect = pg.Rect(rect)
+        self.grid_size = grid_size
+        self.pitch = max(self.MIN_PITCH, min(self.MAX_PITCH, min(self.rect.size) // grid_size))
+        self.offset = (0, 0)  # Column, row of the top-left cell in view.
+        self.hover = None  # Column, row of the cell under the mouse.
+        self.surface: pg.Surface = None
+        self._drawn = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.grid_size}x{self.grid_size} @ {self.rect.topleft})'
+
+    @property
+    def span(self) -> tuple[int, int]:
+        """Number of columns and rows in view."""
+        return tuple(min(self.grid_size, side // self.pitch) for side in self.rect.size)
+
+    def cell_at(self, pos: tuple[int, int]) -> tuple[int, int]:
+        """Returns the column, row under a window position, or None outside the cells in view."""
+        if not self.rect.collidepoint(pos):
+            return None
+        cell = tuple(int((p - origin) // self.pitch) for p, origin in zip(pos, self.rect.topleft))
+        if all(c < span for c, span in zip(cell, self.span)):
+            return cell[0] + self.offset[0], cell[1] + self.offset[1]
+
+    def scroll(self, columns: int, rows: int):
+        self.offset = self._clamp((self.offset[0] + columns, self.offset[1] + rows))
+
+    def zoom(self, steps: int, around: tuple[int, int] = None):
+        """Changes the size of the cells by 'steps', keeping the cell at 'around' (or the center) in place."""
+        pitch = round(self.pitch * 1.25 ** steps)
+        if pitch == self.pitch:
+            pitch += (steps > 0) - (steps < 0)
+        pitch = max(self.MIN_PITCH, min(self.MAX_PITCH, pitch))
+        anchor = [p - origin for p, origin in zip(around, self.rect.topleft)] if around else \
+            [side // 2 for side in self.rect.size]
+        # Cell position (in cells, from the top-left of the board) under the anchor.
+        cell = [offset + a / self.pitch for offset, a in zip(self.offset, anchor)]
+        self.pitch = pitch
+        self.offset = self._clamp(tuple(round(c - a / pitch) for c, a in zip(cell, anchor)))
+
+    def _clamp(self, offset: tuple[int, int]) -> tuple[int, int]:
+        return tuple(max(0, min(o, self.grid_size - span)) for o, span in zip(offset, self.span))
+
+    def update(self, colors: np.ndarray, mouse_pos: tuple[int, int] = None):
+        """
+        Shows the cell colors, an array of shape (cells, 3), and highlights the cell under the mouse.
+        Re-renders and marks the view for redrawing only if anything shown changed.
+        """
+        self.hover = self.cell_at(mouse_pos) if mouse_pos else None
+        view = (self.pitch, self.offset, self.hover)
+        if self._drawn is None or colors is not self._drawn[0] or view != self._drawn[1]:
+            self._drawn = (colors, view)
+            self.surface = self.render(colors)
+            Frame.mark(self.rect)
+
+    def render(self, colors: np.ndarray) -> pg.Surface:
+        (x, y), (columns, rows), pitch = self.offset, self.span, self.pitch
+        cells = colors.reshape(self.grid_size, self.grid_size, 3)[y:y + rows, x:x + columns].copy()
+        if self.hover is not None:
+            cells[self.hover[1] - y, self.hover[0] - x] = self.HOVER_COLOR
+        pixels = cells.repeat(pitch, axis=0).repeat(pitch, axis=1)
+        if pitch >= self.LINE_PITCH:
+            pixels[pitch - 1::pitch] = self.LINE_COLOR
+            pixels[:, pitch - 1::pitch] = self.LINE_COLOR
+        return pg.surfarray.make_surface(pixels.swapaxes(0, 1))
+
+    def draw(self):
+        if self.surface is not None:
+            Display.WINDOW.blit(self.surface, self.rect)
+
+
 class DisplayData:
     """This class draws the images and text to the window."""
-    TITLE = pg.display.get_caption()
     TITLE_POS = (50, 10)
-    TITLE_MSG = MessageBox(TITLE_POS, text=TITLE[1], color=Display.RGB_WHITE)
+    TITLE_MSG = MessageBox(TITLE_POS, text=Display.CAPTION, color=Display.RGB_WHITE, align=(True, False))
 
     START_BUTTON = Box((400, 600, 400, 50), 'Start Button')
     START_BUTTON.color1, START_BUTTON.color2 = Display.RGB_DARK_BLUE, Display.RGB_YELLOW
     START_BTN_TEXT = MessageBox((0, START_BUTTON.y), text='PLAY GAME', size=48, color=Display.RGB_WHITE)
-    START_BTN_TEXT.center(vert=False)
 
     INFO_BUTTON = Box((10, 25, 150, 40), 'Info Button')
     INFO_BUTTON.color1, INFO_BUTTON.color2 = Display.RGB_DARK_BLUE, Display.RGB_YELLOW    
     INFO_BTN_TEXT = MessageBox((0, INFO_BUTTON.y), text='INFO', size=36, color=Display.RGB_WHITE)
-    INFO_BTN_TEXT.center(over_rect=INFO_BUTTON, vert=False)
 
     IMAGES = []
     POSITIONS = []
@@ -123,11 +361,12 @@ class DisplayData:
     SKILL_INTER = MessageBox()
 
     # Displayed along bottom
-    RESULT_MSG = MessageBox((50, Display.HEIGHT - 100), font=MSG_FONT, size=MSG_SIZE)
-    ACTION_MSG = MessageBox((100, Display.HEIGHT - 50), font=MSG_FONT, size=MSG_SIZE)
+    RESULT_MSG = MessageBox((50, Display.HEIGHT - 100), font=MSG_FONT, size=MSG_SIZE, align=(True, False))
+    ACTION_MSG = MessageBox((100, Display.HEIGHT - 50), font=MSG_FONT, size=MSG_SIZE, align=(True, False))
 
     # Displayed at center-top
-    TURN_MSG = MessageBox((0, 50), text='TURN 1', font=Display.FONT_NAME, color=Display.RGB_YELLOW)
+    TURN_MSG = MessageBox((0, 50), text='TURN 1', font=Display.FONT_NAME, color=Display.RGB_YELLOW,
+                          align=(True, False))
     TURN_MSG.change_font(size=30)
 
     # Displayed below associated grid
@@ -141,28 +380,49 @@ class DisplayData:
         (70, Display.HEIGHT - 210), font=MSG_FONT, size=MSG_SIZE-2)
 
     # Displayed in center
-    END_MSG = MessageBox()
+    END_MSG = MessageBox(align=(True, True))
     END_MSG.change_font(name=Display.FONT_NAME, size=56)
     END_MSG.color = Display.RGB_GREEN
 
+    # Messages shown in the game screen, in drawing order.
+    MESSAGES = [TITLE_MSG, RESULT_MSG, ACTION_MSG, TURN_MSG, PLAYER_MSG, P_TGT_MSG, COMP_MSG, C_TGT_MSG, END_MSG]
+
     @classmethod
     def get_messages(cls) -> list[MessageBox]:
+        # The start screen enlarges and moves the title.
+        if cls.TITLE_MSG.dirty:
+            cls.TITLE_MSG.position = cls.TITLE_POS
+            cls.TITLE_MSG.change_font(size=36)
         # Center messages after text is set.
-        cls.TITLE_MSG.position = cls.TITLE_POS
-        cls.TITLE_MSG.change_font(size=36)
-        for msg in [cls.TURN_MSG, cls.ACTION_MSG, cls.RESULT_MSG, cls.TITLE_MSG]:
-            msg.center(vert=False)
+        for msg in cls.MESSAGES:
+            msg.layout()
 
-        # Set colors and center the end game message.
+        # Set colors of the end game message.
         if cls.END_MSG.text:
-            cls.END_MSG.center()
             cls.END_MSG.background = Display.RGB_DARK_BLUE
 
             # Set rate for flashing text.
             interval = Display.FPS * 0.75
             cls.END_MSG.color = Display.RGB_YELLOW if Display.FRAME < interval else cls.END_MSG.background
 
-        return [getattr(cls, attr[0]) for attr in getmembers(cls) if attr[0].endswith('_MSG')]
+        return cls.MESSAGES
+
+    @classmethod
+    def messages(cls) -> list[MessageBox]:
+        return cls.MESSAGES
+
+    @classmethod
+    def add_image(cls, image: pg.Surface, position: pg.Rect):
+        cls.IMAGES.append(image)
+        cls.POSITIONS.append(position)
+
+    @classmethod
+    def remove_image(cls, position: pg.Rect):
+        """Removes the image drawn at the position."""
+        for index, drawn_at in enumerate(cls.POSITIONS):
+            if drawn_at is position:
+                del cls.IMAGES[index], cls.POSITIONS[index]
+                return
 
     @classmethod
     def get_data(cls) -> list[list]:
@@ -170,16 +430,23 @@ class DisplayData:
 
     @classmethod
     def draw(cls):
-        Display.WINDOW.blits(zip(cls.IMAGES, cls.POSITIONS))
-        for msg in cls.get_messages():
-            msg.draw()
-
-        cls.draw_info()
+        """Updates the ships, messages and info button shown in the window. See Frame."""
+        Frame.show_sprites(list(zip(cls.IMAGES, cls.POSITIONS)))
+        Frame.MESSAGES = cls.get_messages()
+        for msg in Frame.MESSAGES:
+            msg.refresh()
+
+        style = cls.INFO_BUTTON.style
+        cls.set_info_style()
+        if cls.INFO_BUTTON.style != style:
+            Frame.mark(cls.INFO_BUTTON)
+        Frame.WIDGETS = [(cls.INFO_BUTTON, cls.draw_info)]
 
     @classmethod
     def draw_start(cls):
         """Draws the start screen displayed upon loading."""
         Display.WINDOW.blit(Display.BACKGROUND, Display.BACK_POS)
+        Frame.invalidate()  # Game screen must be redrawn entirely after the start screen.
 
         cls.TITLE_MSG.change_font(size=64)
         cls.TITLE_MSG.center()
@@ -194,46 +461,76 @@ class DisplayData:
         pg.draw.rect(Display.WINDOW, cls.START_BUTTON.color1, cls.START_BUTTON, 0, 10, 10, 10, 10)
         cls.START_BTN_TEXT.draw()
 
+        cls.set_info_style()
         cls.draw_info()
 
     @classmethod
-    def draw_info(cls):
-        
+    def set_info_style(cls):
         if mouse_over(cls.INFO_BUTTON):
             cls.INFO_BUTTON.color1 = Display.RGB_YELLOW
             cls.INFO_BTN_TEXT.color = Display.RGB_DARK_BLUE
         else:
             cls.INFO_BUTTON.color1 = Display.RGB_DARK_BLUE
             cls.INFO_BTN_TEXT.color = Display.RGB_YELLOW
-        pg.draw.rect(Display.WINDOW, cls.INFO_BUTTON.color1, cls.INFO_BUTTON, 0, 10, 10, 10, 10)
+        cls.INFO_BUTTON.style = (cls.INFO_BUTTON.color1, 0)
+
+    @classmethod
+    def draw_info(cls):
+        cls.INFO_BUTTON.draw()
         cls.INFO_BTN_TEXT.draw()
 
 
+def init():
+    """
+    Opens the game window and loads the images drawn in it.
+    Nothing is loaded on import, so the game rules can be used without a window (see bsheadless).
+    """
+    if Display.WINDOW is not None:
+        return
+    pg.display.init()
+    Display.WINDOW = pg.display.set_mode((Display.WIDTH, Display.HEIGHT))
+    pg.display.set_caption(Display.CAPTION)
+    pg.display.set_icon(pg.image.load(Display.ICON_FILE))
+    Display.BACKGROUND = pg.image.load(Display.BACKGROUND_FILE).convert()
+    Display.BACK_POS = (Display.WIDTH // 2 - Display.BACKGROUND.get_width() // 2,
+                        Display.HEIGHT // 2 - Display.BACKGROUND.get_height() // 2)
+
+    DisplayData.START_BTN_TEXT.center(vert=False)
+    DisplayData.INFO_BTN_TEXT.center(over_rect=DisplayData.INFO_BUTTON, vert=False)
+    Frame.invalidate()
+
+
 def mouse_over(surface: Union[pg.Rect, pg.Surface]) -> bool:
-    mouse_pos = pg.mouse.get_pos()
+    """Tests the mouse position of the current frame. See Pointer."""
     if type(surface) is pg.Surface:
         surf_rect = surface.get_rect()
     else:
         surf_rect = surface
-    return surf_rect.collidepoint(mouse_pos)
+    return surf_rect.collidepoint(Pointer.POS)
 
 
 def get_mouse_over(rect_list: list[pg.Rect]) -> pg.Rect:
-    for rect in rect_list:
-        if mouse_over(rect):
-            return rect
+    if isinstance(rect_list, Grid):
+        return rect_list.box_at(Pointer.POS)
+    index = pg.Rect(Pointer.POS, (1, 1)).collidelist(rect_list)
+    return rect_list[index] if index >= 0 else None
 
 
 def draw_images(images: list, positions: list):
-    Display.WINDOW.blits(zip(images, positions))
+    """Draws images over the game screen for the current frame only, e.g. a ship following the cursor."""
+    Frame.OVERLAY.extend(zip(images, positions))
 
 
 def draw_grids(grid1: list[Box] = None, grid2: list[Box] = None, headers1=None, headers2=None):
-    Display.WINDOW.blit(Display.BACKGROUND, Display.BACK_POS)
+    """Updates the appearance of the grid boxes. Only boxes that changed are redrawn. See Frame."""
+    Frame.GRID = grid1 + grid2
+    Frame.HEADERS = headers1 + headers2 if headers1 and headers2 else []
+    Pointer.GRIDS = tuple(grid for grid in (grid1, grid2) if isinstance(grid, Grid))
+    Pointer.locate()
 
-    if headers1 and headers2:
-        for header in headers1+headers2:
-            Display.WINDOW.blits(header)
+    # Show expanded selection on mouse-over.
+    if isinstance(grid2, Grid):
+        activate_group(grid2, grid2.box_at(Pointer.POS))
 
     # Set rate for flashing cursor.
     Display.FRAME = (Display.FRAME + 1) % Display.FPS
@@ -242,15 +539,13 @@ def draw_grids(grid1: list[Box] = None, grid2: list[Box] = None, headers1=None,
     for box in (grid1 + grid2):
         set_color = box.color2 if box.color2 else box.color1
 
-        # Show expanded selection on mouse-over.
-        hover_box = box if mouse_over(box) else None
-        activate_group(grid2, hover_box)
+        hovered = box is Pointer.BOX
 
         # Box will flash on mouse-over.
         if Display.FRAME < interval:
             box_color = Display.RGB_YELLOW \
                 if (
-                    mouse_over(box)
+                    hovered
                     or box.active  # Set by activate_group
                     or box.flash  # Set by external module function
                     ) \
@@ -258,23 +553,110 @@ def draw_grids(grid1: list[Box] = None, grid2: list[Box] = None, headers1=None,
         else:
             box_color = set_color
 
-        if box.color2 or box.active or box.flash or mouse_over(box):
-            pg.draw.rect(Display.WINDOW, box_color, box, 0, 10, 10, 10, 10)
+        if box.color2 or box.active or box.flash or hovered:
+            style = (box_color, 0)
         else:
-            pg.draw.rect(Display.WINDOW, box_color, box, 2, 10, 10, 10, 10)
-
-
-def activate_group(grid: list[Box], origin: Box):
-    if origin in grid:
-        if Display.EXPAND_ROW:
-            group = [box for box in grid if box.y == origin.y]
-            for box in grid:
-                box.active = True if box in group else False
-        elif Display.EXPAND_COL:
-            group = [box for box in grid if box.x == origin.x]
-            for box in grid:
-                box.active = True if box in group else False
-    else:
-        if Display.FRAME == Display.FPS-1:
-            for box in grid:
-                box.active = False
+            style = (box_color, 2)
+        if style != box.style:
+            box.style = style
+            Frame.mark(box)
+
+
+def activate_group(grid: Grid, origin: Box):
+    """
+    Activates the row or column of boxes through origin while Display.EXPAND_ROW or EXPAND_COL is set,
+    and deactivates the group shown before. Boxes only change when the group changes.
+    """
+    group = ()
+    if origin is not None and (Display.EXPAND_ROW or Display.EXPAND_COL):
+        x, y = grid.coord_at(origin.center)
+        group = grid.rows[y] if Display.EXPAND_ROW else grid.columns[x]
+    if group is not grid.group:
+        for box in grid.group:
+            box.active = False
+        for box in group:
+            box.active = True
+        grid.group = group
+
+
+class Frame:
+    """
+    Tracks the regions of the window that changed since the last update.
+    Only those regions are redrawn, layer by layer, and pushed to the display.
+    """
+    DIRTY: list[pg.Rect] = []
+    FULL = True  # Redraw and push the entire window on the next update.
+
+    # Layers drawn in order: background, headers, grid, views, sprites, messages, widgets.
+    HEADERS: list[list[tuple[pg.Surface, tuple]]] = []
+    GRID: list[Box] = []
+    VIEWS: list[Viewport] = []
+    SPRITES: list[tuple[pg.Surface, pg.Rect]] = []
+    OVERLAY: list[tuple[pg.Surface, tuple]] = []  # Sprites requested for the current frame only.
+    MESSAGES: list[MessageBox] = []
+    WIDGETS: list[tuple[pg.Rect, callable]] = []
+
+    _shown_sprites: list[tuple[pg.Surface, pg.Rect]] = []
+
+    @classmethod
+    def mark(cls, rect: pg.Rect):
+        if rect:
+            cls.DIRTY.append(pg.Rect(rect))
+
+    @classmethod
+    def invalidate(cls):
+        cls.FULL = True
+
+    @classmethod
+    def show_sprites(cls, sprites: list[tuple[pg.Surface, Union[pg.Rect, tuple]]]):
+        cls.SPRITES = [(image, image.get_rect(topleft=pos.topleft if isinstance(pos, pg.Rect) else pos))
+                       for image, pos in sprites]
+
+    @classmethod
+    def update(cls):
+        """Redraws the changed regions and pushes them to the display."""
+        if Display.HEADLESS:
+            return
+        sprites = cls.SPRITES + [(image, image.get_rect(topleft=pos)) for image, pos in cls.OVERLAY]
+        cls.OVERLAY = []
+        if sprites != cls._shown_sprites:
+            for image, rect in cls._shown_sprites + sprites:
+                if (image, rect) not in sprites or (image, rect) not in cls._shown_sprites:
+                    cls.mark(rect)
+            cls._shown_sprites = sprites
+
+        if cls.FULL:
+            cls.repaint(Display.WINDOW.get_rect())
+            pg.display.flip()
+        elif cls.DIRTY:
+            # Boxes are always redrawn whole. Rounded outlines are not drawn reliably when clipped.
+            dirty = [rect.unionall([cls.GRID[index] for index in rect.collidelistall(cls.GRID)])
+                     for rect in cls.DIRTY]
+            for rect in dirty:
+                cls.repaint(rect)
+            pg.display.update(dirty)
+        cls.FULL = False
+        cls.DIRTY = []
+
+    @classmethod
+    def repaint(cls, area: pg.Rect):
+        window = Display.WINDOW
+        window.set_clip(area)
+        window.blit(Display.BACKGROUND, Display.BACK_POS)
+        for header in cls.HEADERS:
+            window.blits(header)
+        for index in area.collidelistall(cls.GRID):
+            cls.GRID[index].draw()
+        for view in cls.VIEWS:
+            if area.colliderect(view.rect):
+                view.draw()
+        for image, rect in cls._shown_sprites:
+            if area.colliderect(rect):
+                window.blit(image, rect)
+        for msg in cls.MESSAGES:
+            if area.colliderect(msg.rect):
+                msg.blit()
+        for rect, draw in cls.WIDGETS:
+            if area.colliderect(rect):
+                draw()
+        window.set_clip(None)
@@ -0,0 +1,149 @@
+"""
+Runs Comp-vs-Comp games with the rules in bsmain, but without a window,
+audio output or firing delays. Call configure() before playing games.
+Usage: python bsheadless.py --games 100 --levels 3 2
+"""
+import os
+import argparse
+import logging as lg
+import random as rd
+import time
+import bsgui as ui
+import bsmain as bs
+import bssound as sb
+import bsreplay as rp
+import gamerbase as gb
+from gamerbase import GameState as State
+
+MAX_TURNS = 500
+
+
+def configure():
+    """Switches the process to headless play: no window updates, effect delays or sound."""
+    # Nothing opens a window or the mixer after this; the dummy drivers make sure of it.
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    ui.Display.HEADLESS = True
+    bs.Effects.ENABLED = False
+    sb.SoundBank.disable()
+
+
+def new_game(levels=(3, 3), grid_size=bs.Board.GRID_SIZE, rng: rd.Random = None,
+             skills: gb.SkillScheduler = None) -> tuple[list[bs.Board], list[list]]:
+    """
+    Creates two Comp players with randomly placed fleets, sharing the random number generator if given.
+    Their Specials share the skill scheduler of the game if given, else a new one.
+    Returns their boards and fleets.
+    """
+    skills = skills if skills is not None else gb.SkillScheduler()
+    comp1, comp2 = gb.Comp(difficulty=levels[0], rng=rng), gb.Comp(difficulty=levels[1], rng=rng)
+    comp1.set_opponent(comp2)
+    comp2.set_opponent(comp1)
+
+    boards, fleets = [], []
+    for comp in (comp1, comp2):
+        board = bs.Board(comp)
+        board.init_targets(grid_size=grid_size)
+        fleet = bs.deploy_fleet(board, comp, bs.fleet_copies(grid_size), skills)
+        bs.place_random(board, fleet)
+        boards.append(board)
+        fleets.append(fleet)
+    return boards, fleets
+
+
+def play_game(levels=(3, 3), max_turns=MAX_TURNS, grid_size=bs.Board.GRID_SIZE,
+              seed: int = None, recorder: rp.Recorder = None) -> dict:
+    """
+    Plays one game to completion. The first Comp takes the PLAY turns and the second the COMP turns.
+    The game is reproducible if a seed is given, and written to the replay log if a recorder is given.
+    A recorded game without a seed is given a random one.
+    Returns the index of the winning Comp (None if max_turns is reached), the number of turns,
+    and per-Comp shots fired, enemy ships sunk and skill usage as {name: (attempts, activations)}.
+    """
+    if recorder is not None and seed is None:
+        seed = rd.randrange(2 ** 63)  # Recorded, so the game can be verified.
+    game = gb.GameFlow()
+    boards, fleets = new_game(levels, grid_size, rd.Random(seed) if seed is not None else None, game.skills)
+    if recorder is not None:
+        recorder.start(boards, seed, levels, max_turns)
+    game.progress_flow(start=State.PLAY)
+
+    winner = None
+    while game.turn <= max_turns:
+        if game.state is State.PLAY:
+            turn_end = bs.comp_turn(boards[1], fleets[0], levels[0])
+        elif game.state is State.COMP:
+            turn_end = bs.comp_turn(boards[0], fleets[1], levels[1])
+        else:  # State.WAIT
+            statuses = [board.player.status for board in boards]
+            if bs.victory(*statuses):
+                winner = 1 if statuses[0].defeated else 0
+                break
+            turn_end = True
+
+        if turn_end:
+            game.progress_flow()
+
+    result = {'winner': winner,
+              'levels': tuple(levels),
+              'turns': game.turn,
+              'shots': (boards[1].shots, boards[0].shots),
+              'sinks': (boards[1].player.status.sunk.bit_count(), boards[0].player.status.sunk.bit_count()),
+              'skills': tuple({ship.special.name: (ship.special.attempts, ship.special.activations)
+                               for ship in fleet} for fleet in fleets)
+              }
+
+    if recorder is not None:
+        recorder.end(winner, game.turn)
+    bs.clear_boards(boards)
+    for board in boards:
+        gb.Player.remove_player(board.player)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Comp-vs-Comp games without a display.')
+    parser.add_argument('-n', '--games', type=int, default=10)
+    parser.add_argument('-l', '--levels', type=int, nargs=2, default=(3, 3), metavar=('LEVEL1', 'LEVEL2'))
+    parser.add_argument('-g', '--grid', type=int, default=bs.Board.GRID_SIZE, metavar='N', help='board size')
+    parser.add_argument('-t', '--max-turns', type=int, default=MAX_TURNS)
+    parser.add_argument('-s', '--seed', type=int, default=None, help='seed of the first game (seed + n for game n)')
+    parser.add_argument('-r', '--record', metavar='PATH', help='append the games to a replay log (see bsreplay)')
+    parser.add_argument('-p', '--profile', nargs='?', const='', metavar='JSON_PATH',
+                        help='print call timings of the game functions, and optionally write them as JSON')
+    args = parser.parse_args()
+    if not bs.Board.GRID_SIZE <= args.grid <= bs.Board.MAX_GRID_SIZE:
+        parser.error(f'--grid must be between {bs.Board.GRID_SIZE} and {bs.Board.MAX_GRID_SIZE}')
+    seeds = (args.seed, args.seed + args.games - 1) if args.seed is not None else ()
+    if args.record and not all(seed in rp.SEEDS for seed in seeds):
+        parser.error('--seed must fit in 64 bits to record the games')
+    if args.record and args.max_turns > rp.MAX_TURNS:
+        parser.error(f'--max-turns must be at most {rp.MAX_TURNS} to record the games')
+
+    configure()
+    lg.getLogger().setLevel(lg.WARNING)
+    gb.Profiler.enable(args.profile is not None)
+    wins = [0, 0]
+    recorder = rp.Recorder(open(args.record, 'ab')) if args.record else None
+    start = time.perf_counter()
+    for n in range(args.games):
+        seed = None if args.seed is None else args.seed + n
+        result = play_game(args.levels, args.max_turns, args.grid, seed, recorder)
+        if result['winner'] is not None:
+            wins[result['winner']] += 1
+    elapsed = time.perf_counter() - start
+    if recorder is not None:
+        recorder.file.close()
+
+    print(f'{args.games} game(s) in {elapsed:.2f} second(s) ({args.games / elapsed:.1f} games/s)')
+    for n, level in enumerate(args.levels):
+        print(f'Comp {n + 1} (level {level}): {wins[n]} win(s)')
+
+    if args.profile is not None:
+        print(gb.Profiler.report())
+        if args.profile:
+            gb.Profiler.to_json(args.profile)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,19 @@
 import os
+import argparse
 import webbrowser
 import pygame as pg
 import logging as lg
 import random as rd
+import numpy as np
 import bsgui as ui
+import bssound as sb
 import bsvessels as vs
 import gamerbase as gb
+from bsstate import BoardState, Geometry, PlacementTable, bits, to_array
 from typing import Union
+from functools import partial
 from gamerbase import GameState as State, Log, SkillType as SkType
 
-pg.mixer.init()
 lg.basicConfig(level=lg.INFO, format=' %(asctime)s - %(levelname)s - %(message)s')
 
 
@@ -22,25 +26,26 @@ class Target:
     MISS_COLOR = ui.Display.RGB_WHITE
     NO_COLOR = ui.Display.RGB_DARK_BLUE
 
-    LAUNCH_SOUND = pg.mixer.Sound('Sounds/missile.wav')
-    HIT_SOUND = pg.mixer.Sound('Sounds/hit2.wav')
-    SINK_SOUND = pg.mixer.Sound('Sounds/explosion.mp3')
+    # Names in the sound bank (see bssound).
+    LAUNCH_SOUND = 'launch'
+    HIT_SOUND = 'hit'
+    SINK_SOUND = 'sink'
 
-    def __init__(self, x=0, y=0, size=50, xy_offset=(50, 50)):
+    def __init__(self, x=0, y=0, size=50, xy_offset=(50, 50), state: BoardState = None):
         # x, y = Target column, row
         self._x = x
         self._y = y
         self._coord = (x, y)
-        # Position is the Target's alphanumeric reference, e.g. (0, 0) = "A1".
-        # ASCII values, ord() and chr() are used for this conversion.
+        # Results and occupancy are stored in the board's bitboards; Target is a view over one cell.
+        self._state = state if state is not None else BoardState(max(x, y) + 1)
+        self._index = self._state.index(x, y)
+        # Position is the Target's alphanumeric reference, e.g. (0, 0) = "A1", (26, 0) = "AA1".
         self._name = self.convert_coord(x, y)
         # Box is a pygame rectangle for use with the user interface.
         self._box = ui.Box(
             dimensions=(x * size + (x + xy_offset[0]), y * size + (y + xy_offset[1]), size, size),
             box_name=self.name
         )
-        self._checked = False
-        self._result = ''
         self.ship: Union[vs.Vessel, None] = None
 
     def __repr__(self):
@@ -48,62 +53,84 @@ class Target:
 
     @staticmethod
     def convert_coord(x, y):
-        return f'{chr(x + 97).upper()}{y + 1}'
+        return f'{Target.column_name(x)}{y + 1}'
+
+    @staticmethod
+    def column_name(x) -> str:
+        """Names columns like spreadsheet columns: A to Z, then AA to ZZ, AAA..."""
+        name = ''
+        x += 1
+        while x:
+            x, letter = divmod(x - 1, 26)
+            name = chr(letter + 65) + name
+        return name
 
     def attack(self) -> bool:
-        """Executed when Player has selected a Target. Returns 'True' on hit."""
+        """
+        Executed when Player has selected a Target. Returns 'True' on hit.
+        The result is marked at once. Its color and message are shown in sequence with the effects.
+        """
         if self.occupied:
             self.ship.hit()
-            self.result = 'HIT'
-            self.box.color2 = self.HIT_COLOR
+            self._state.mark_hit(self._index)
             if self.ship.sunk:
-                ui.DisplayData.TARGET_INTER.text = f"{self.ship} SUNK!"
+                message = f"{self.ship} SUNK!"
             else:
-                ui.DisplayData.TARGET_INTER.text = f'{self.ship} {self.result} @ {self}...'
+                message = f'{self.ship} {self.result} @ {self}...'
+            Effects.show(partial(self.show_result, message, hit=True))
         else:
-            self.result = 'MISS'
-            self.box.color2 = self.MISS_COLOR
-            # Prioritize hit/sunk messages
-            if ('HIT' or 'SUNK') not in ui.DisplayData.TARGET_INTER.text:
-                ui.DisplayData.TARGET_INTER.text = f'{self.result} @ {self}...'
+            self._state.mark_miss(self._index)
+            Effects.show(partial(self.show_result, f'{self.result} @ {self}...', hit=False))
         return self.occupied
 
+    def show_result(self, message: str, hit: bool):
+        self.paint()
+        # Prioritize hit/sunk messages
+        if hit or 'HIT' not in ui.DisplayData.TARGET_INTER.text:
+            ui.DisplayData.TARGET_INTER.text = message
+
+    def paint(self):
+        """Colors the box by the current result of the cell."""
+        self.box.flash = False
+        self.box.color2 = {'HIT': self.HIT_COLOR, 'MISS': self.MISS_COLOR}.get(self.result)
+
     def reset(self):
         self.result = ''
 
     @property
     def checked(self) -> bool:
-        return bool(self.result)
+        return self._state.is_checked(self._index)
 
     @property
     def result(self) -> str:
-        return self._result
+        return self._state.result(self._index)
 
     @result.setter
     def result(self, hit_miss: str):
-        self._result = hit_miss
         self.box.flash = False
         match hit_miss:
             case 'HIT':
+                self._state.mark_hit(self._index)
                 self.box.color2 = self.HIT_COLOR
             case 'MISS':
+                self._state.mark_miss(self._index)
                 self.box.color2 = self.MISS_COLOR
             case _:
-                self._result = ''
+                self._state.clear(self._index)
                 self.box.color2 = None
 
     @property
     def ship(self) -> vs.Vessel:
-        return self._ship
+        return self._state.ships[self._index]
 
     @ship.setter
     def ship(self, ship: vs.Vessel):
-        self._ship = ship
+        self._state.place(self._index, ship)
         self.box.color3 = ui.Display.RGB_YELLOW if ship else None
 
     @property
     def occupied(self) -> bool:
-        return bool(self.ship)
+        return self._state.is_occupied(self._index)
 
     # ----- Read-only Properties -----
 
@@ -123,6 +150,10 @@ class Target:
     def coord(self) -> tuple[int, int]:
         return self._coord
 
+    @property
+    def index(self) -> int:
+        return self._index
+
     @property
     def box(self) -> ui.Box:
         return self._box
@@ -132,19 +163,32 @@ class Board:
     """This represents the field where ships are placed.
     The board is composed of a collection of pygame rectangles to form a grid.
     """
-    ORDINAL = ((1, 0), (0, 1), (-1, 0), (0, -1))
+    ORDINAL = Geometry.ORDINAL
     SQR_SIZE = 50
     GRID_SIZE = 10
+    MAX_GRID_SIZE = 200
     GRID_POS = (50, 50)
-    SEARCH_DIR = 0
     DETECTED: Target = None
 
-    def __init__(self, player: gb.Player):
+    def __init__(self, player: gb.Player, rng: rd.Random = None):
         self.player = player
-        self.positions = {}
+        self.rng = rng if rng is not None else player.rng
+        self.viewport: ui.Viewport = None  # Shows large boards in place of the grid boxes.
+        self._colors = (None, None)
+        self.state: BoardState = None
+        self.geometry: Geometry = None
+        self.rows: list[tuple[Target, ...]] = []
+        self.columns: list[tuple[Target, ...]] = []
+        self.positions = {}  # key='A1', value=Target(object)
+        self.targets: list[Target] = []  # Indexed by cell, i.e. y * GRID_SIZE + x
         self.grid = []
-        self.headers = []
+        self._headers = None
         self.target_locked = False
+        self.shots = 0  # Shots fired at this board
+        self.recorder = None  # Replay log recording this board's events (see bsreplay).
+        self.remark_hits = False  # Countermeasures mark the damage of a relocated ship at its new position.
+        self.remarked = 0  # Cells marked hit that way, until collected (see bsnet).
+        self.reveal_sunk = False  # Sunk ships are shown on the board, which hides its fleet otherwise.
 
     def __repr__(self):
         return f"{self.player}'s Board"
@@ -161,19 +205,29 @@ class Board:
         if grid_pos != self.GRID_POS:
             self.GRID_POS = grid_pos
 
-        for row_y in range(grid_size):
-            for col_x in range(grid_size):
-                pos = Target(x=col_x, y=row_y, size=sqr_size, xy_offset=grid_pos)
-                self.positions.setdefault(pos.name, pos)  # key='A1', value=Target(object)
+        self.state = BoardState(grid_size)
+        self.targets = [Target(x=col_x, y=row_y, size=sqr_size, xy_offset=grid_pos, state=self.state)
+                        for row_y in range(grid_size) for col_x in range(grid_size)]
+        self.positions = {target.name: target for target in self.targets}
+        self.geometry = Geometry.for_size(grid_size)
+        self.rows = [tuple(self.targets[index] for index in row) for row in self.geometry.rows]
+        self.columns = [tuple(self.targets[index] for index in column) for column in self.geometry.columns]
 
-        boxes = [target.box for target in self.positions.values()]
-        self.grid = boxes
-        self.create_headers(grid_pos)
+        boxes = [target.box for target in self.targets]
+        self.grid = ui.Grid(boxes, sqr_size + 1, grid_size)  # Boxes are separated by 1 pixel.
+        self._headers = None  # Rendered on first use.
+
+    @property
+    def headers(self) -> list[list[tuple[pg.Surface, tuple]]]:
+        if self._headers is None:
+            self._headers = self.create_headers(self.GRID_POS)
+        return self._headers
 
-    def create_headers(self, grid_pos):
+    def create_headers(self, grid_pos) -> list[list[tuple[pg.Surface, tuple]]]:
         """Generates headers to display over grid."""
+        headers = []
         offset_x, offset_y = map(lambda x: x + 10, grid_pos)
-        font, color = ui.Display.FONT, ui.Display.FONT_COLOR
+        font, color = ui.Fonts.get(ui.Display.FONT_NAME, ui.Display.FONT_SIZE), ui.Display.FONT_COLOR
 
         # Create list of row headings and positions for drawing(WINDOW.blits).
         rx = offset_x - self.SQR_SIZE * 0.75
@@ -183,103 +237,143 @@ class Board:
                                        for y in range(self.GRID_SIZE)]
 
         row_head = [(row, pos) for row, pos in zip(row_header, row_header_pos)]
-        self.headers.append(row_head)
+        headers.append(row_head)
 
         # Create list of column headings/positions.
         ry = offset_y - self.SQR_SIZE * 0.75
-        col_header: list[pg.Surface] = [font.render(chr(x + 97), True, color)
+        col_header: list[pg.Surface] = [font.render(Target.column_name(x).lower(), True, color)
                                         for x in range(self.GRID_SIZE)]
         col_header_pos: list[tuple] = [(self.SQR_SIZE * x + (x + offset_x), ry)
                                        for x in range(self.GRID_SIZE)]
 
         col_head = [(col, pos) for col, pos in zip(col_header, col_header_pos)]
-        self.headers.append(col_head)
+        headers.append(col_head)
+        return headers
 
     def select_row(self, target=None) -> list[Target]:
         if target is None:
             target = self.select_target()
         if target is not None:
-            positions = [
-                Target.convert_coord((target.x + x) % self.GRID_SIZE, target.y) for x in range(self.GRID_SIZE)
-            ]
-            return [self.positions[pos] for pos in positions]
+            row = self.rows[target.y]
+            return list(row[target.x:] + row[:target.x])
 
     def select_column(self, target=None) -> list[Target]:
         if target is None:
             target = self.select_target()
         if target is not None:
-            positions = [
-                Target.convert_coord(target.x, (target.y + y) % self.GRID_SIZE) for y in range(self.GRID_SIZE)
-            ]
-            return [self.positions[pos] for pos in positions]
+            column = self.columns[target.x]
+            return list(column[target.y:] + column[:target.y])
 
     def select_target(self, random=False, target_list=()) -> Target:
         """
         Target selected from board positions or specified list.
         Selection may be random or provided by mouse input.
         """
-        selected = None
-        targets = list(target_list) if target_list else list(self.positions.values())
-
         if random:
-            selected = rd.choice(targets)
-        else:
-            for target in targets:
-                if ui.mouse_over(target.box):
-                    selected = target
+            return self.rng.choice(target_list if target_list else self.targets)
+
+        selected = self.hovered
+        if target_list and selected not in target_list:
+            selected = None
         return selected
 
+    def cell_at(self, pos: tuple[int, int]) -> Target:
+        """
+        Returns the Target under a window position, or None outside the grid or between boxes.
+        The cell is calculated from the grid layout, so the cost does not grow with the board.
+        """
+        if self.viewport is not None:
+            cell = self.viewport.cell_at(pos)
+            return self.target_at(*cell) if cell is not None else None
+
+        index = self.grid.index_at(pos)
+        return self.targets[index] if index is not None else None
+
+    @property
+    def hovered(self) -> Target:
+        """Target under the mouse in the current frame. See ui.Pointer."""
+        return self.cell_at(ui.Pointer.POS)
+
     @Log.call_log
     def comp_target(self, comp_level: int):
-        selected = rd.choice(list(self.positions.values()))
-        if comp_level == 3 or (comp_level == 2 and self.target_locked):
-            hits = [target for target in self.positions.values() if target.result == 'HIT']
-            target_found = self.search_target(hits, comp_level)
+        """
+        Selects the Comp's next target by difficulty level.
+        1: random, 2: follows up on hits while locked, 3: always follows up on hits,
+        4: as 3, but hunts by the probability density of the remaining ships.
+        """
+        unchecked = self.state.unchecked()
+        if not unchecked:
+            return None
+        selected = self.targets[self.rng.choice(unchecked)]
+        if comp_level >= 3 or (comp_level == 2 and self.target_locked):
+            target_found = self.search_target(comp_level)
 
             if target_found:
                 selected = target_found
             else:
                 self.target_locked = False
+                if comp_level == 4:
+                    selected = self.hunt_target() or selected
         return selected
 
+    def hunt_target(self) -> Target:
+        """Returns one of the unchecked targets where the remaining ships are most likely to be."""
+        if self.state.density is not None:
+            peaks = self.state.density.peaks(exclude=self.state.checked)
+            if peaks:
+                return self.targets[self.rng.choice(peaks)]
+
     @Log.call_log
-    def search_target(self, hit_list: list[Target], comp_level: int) -> Target:
-        detected = [target for target in hit_list if not target.ship.sunk]
-
-        while detected:
-            target = rd.choice(detected)
-            calculated = self.calculate_target(target.coord)
-            if calculated:
-                return calculated
-            elif comp_level == 3:  # Comp difficulty = 'Hard'
-                detected.remove(target)
-                lg.debug(f'Reassessing...(detected={detected})')
-                continue
-            else:
-                break
+    def search_target(self, comp_level: int) -> Target:
+        """
+        Returns an unchecked target next to a hit on a ship still afloat, from the board's Frontier.
+        From level 3 ('Hard'), targets in line with two hits are tried first.
+        """
+        index = self.state.frontier.pick(self.rng, aligned=comp_level >= 3)
+        return self.targets[index] if index is not None else None
 
     @Log.call_log
     def calculate_target(self, coord: tuple[int, int], rand_dir=False) -> Target:
-        attempts_remaining = 4
-        while attempts_remaining:
-            dx, dy = rd.choice(list(self.ORDINAL)) if rand_dir else self.ORDINAL[self.SEARCH_DIR]
-            x, y = coord
+        """
+        Returns an unchecked neighbor of the cell, the first in ORDINAL order or a random one.
+        Neighbors wrap around to compensate for edge of board.
+        """
+        neighbors = [index for index in self.geometry.wrapped[self.state.index(*coord)]
+                     if not self.state.is_checked(index)]
+        if neighbors:
+            return self.targets[self.rng.choice(neighbors) if rand_dir else neighbors[0]]
 
-            # Adjust range to compensate for edge of board.
-            nx = (x + dx) % self.GRID_SIZE
-            ny = (y + dy) % self.GRID_SIZE
+    def target_at(self, x: int, y: int) -> Target:
+        return self.targets[self.state.index(x, y)]
 
-            calc_target = self.positions[Target.convert_coord(nx, ny)]
-            lg.debug(f'calc_target={calc_target} (coord={coord}, direction={self.SEARCH_DIR})')
+    def targets_in(self, mask: int) -> list[Target]:
+        """Returns the Targets for every cell set in a bitboard mask."""
+        return [self.targets[index] for index in bits(mask)]
 
-            if calc_target.checked:
-                d = self.SEARCH_DIR
-                self.SEARCH_DIR = (d + 1) % 4
-                attempts_remaining -= 1
-                lg.debug(f'Target checked. Adjusting... (direction={self.SEARCH_DIR}, attempts={attempts_remaining})')
-                continue
+    def span(self, target: Target, length: int, vertical=False) -> int:
+        """Returns the mask of cells a ship would cover from target (0 if off the board)."""
+        return self.state.span_mask(target.index, length, vertical)
 
-            return calc_target
+    def cell_colors(self, reveal_ships=False) -> np.ndarray:
+        """
+        Returns the color of every cell as an array of shape (cells, 3), for drawing in a Viewport.
+        The array is rebuilt only after a shot result or ship position changes.
+        """
+        state = self.state
+        key = (state.hits, state.misses, state.occupied if reveal_ships else 0)
+        if key != self._colors[0]:
+            colors = np.empty((state.cells, 3), dtype=np.uint8)
+            colors[:] = Target.NO_COLOR
+            if reveal_ships:
+                colors[to_array(state.occupied, state.cells)] = ui.Display.RGB_YELLOW
+            colors[to_array(state.misses, state.cells)] = Target.MISS_COLOR
+            colors[to_array(state.hits, state.cells)] = Target.HIT_COLOR
+            self._colors = (key, colors)
+        return self._colors[1]
+
+    @property
+    def placements(self) -> PlacementTable:
+        return PlacementTable.for_size(self.GRID_SIZE)
 
     @property
     def target_locked(self) -> bool:
@@ -290,33 +384,75 @@ class Board:
         self._locked = is_locked
 
 
+class Effects:
+    """
+    Controls the sound effects and pauses of the firing sequences.
+    Effects are queued on a Sequencer advanced by the main loop, so the window stays responsive.
+    Disabled for headless games.
+    """
+    ENABLED = True
+    DELAY = 1000  # milliseconds
+    SEQUENCE = gb.Sequencer()
+
+    @classmethod
+    def play(cls, sound: str):
+        """Queues a sound from the sound bank by name."""
+        if cls.ENABLED:
+            cls.SEQUENCE.then(partial(sb.SoundBank.play, sound))
+
+    @classmethod
+    def pause(cls, delay=DELAY):
+        if cls.ENABLED:
+            cls.SEQUENCE.wait(delay)
+
+    @classmethod
+    def show(cls, action):
+        """Queues a visual change to appear in sequence with the sound effects."""
+        if cls.ENABLED:
+            cls.SEQUENCE.then(action)
+        else:
+            action()
+
+    @classmethod
+    def busy(cls) -> bool:
+        return cls.ENABLED and cls.SEQUENCE.busy
+
+
 # ========== FLEET CREATION AND POSITIONING METHODS ==========
 
-def deploy_fleet(board: Board, player: gb.Player) -> list[vs.Vessel]:
+# Ship types of a fleet, in deployment order. Ships are numbered in this order (see bsreplay, bsnet).
+FLEET = (vs.Carrier, vs.Cruiser, vs.Destroyer, vs.Submarine, vs.Frigate)
+
+
+def fleet_copies(grid_size: int) -> int:
+    """Number of ships of each type for a board, keeping large boards about as crowded as the default."""
+    return max(1, (grid_size // Board.GRID_SIZE) ** 2 // 4)
+
+
+def deploy_fleet(board: Board, player: gb.Player, copies=1, skills: gb.SkillScheduler = None) -> list[vs.Vessel]:
     """
     Creates new Player attributes to link player to board and ships.
-    Initializes Vessel instances.
+    Initializes Vessel instances, with 'copies' ships of each type for large boards.
     Sets image size and adds 'player' attribute to the Vessel.
+    Specials count their cooldowns in the turns of 'skills', the game's scheduler (see GameFlow).
     """
     player.__setattr__('board', board)
-    player.__setattr__(
-        'fleet', {'Carrier': vs.Carrier(),
-                  'Cruiser': vs.Cruiser(),
-                  'Destroyer': vs.Destroyer(),
-                  'Submarine': vs.Submarine(),
-                  'Frigate': vs.Frigate()
-                  }
-    )
+    player.__setattr__('fleet', {})
+    for n in range(copies):
+        suffix = f' {n + 1}' if n else ''
+        for vessel in FLEET:
+            ship = vessel(player.rng)
+            player.fleet[ship.type + suffix] = ship
     fleet = player.fleet.values()
-    height = board.SQR_SIZE
+    board.state.track_density([ship.size for ship in fleet])
+    player.__setattr__('status', vs.FleetStatus(fleet))
     for ship in fleet:
         ship.__setattr__('player', player)
         ship.name = f'{player.name[0]}{ship.name}'
-        width = height * ship.size + ship.size
-        ship.image = pg.transform.scale(ship.image, (width, height))
+        ship.sqr_size = board.SQR_SIZE
 
         # ----- Assign Special from skills module -----
-        ship.__setattr__('special', Special(ship))
+        ship.__setattr__('special', Special(ship, skills))
 
     return list(fleet)
 
@@ -327,37 +463,30 @@ def place_ship(board: Board, fleet, rotate=False) -> bool:
     Returns boolean to continue/break setup loop in the main game loop.
     """
     fleet_deployed = False
-    ships = [ship for ship in fleet if ship.image not in ui.DisplayData.IMAGES]
+    ships = [ship for ship in fleet if not ship.position]
     ship = ships[0]
-    vertical = ship.image.get_width() < ship.image.get_height()
+    vertical = ship.facing is vs.Align.VERTICAL
 
     # Rotate image without placing the ship.
     if rotate:
-        angle = 90 if vertical else -90
-        ship.image = pg.transform.rotate(ship.image, angle)
+        ship.facing = vs.Align.HORIZONTAL if vertical else vs.Align.VERTICAL
         return fleet_deployed
 
     target = board.select_target()
     if target is not None:
-        if vertical:
-            positions = [Target.convert_coord(target.x, target.y + y) for y in range(ship.size)]
-        else:
-            positions = [Target.convert_coord(target.x + x, target.y) for x in range(ship.size)]
+        mask = board.span(target, ship.size, vertical)
 
         while True:
-            try:
-                targets = [board.positions[pos] for pos in positions]
-            except KeyError:
+            if not mask:
                 lg.info('Insufficient space. Reselect')
                 break
             else:
-                pos_occupied = [target.occupied for target in targets]
-                if any(pos_occupied):
+                if not board.state.vacant(mask):
                     lg.info(f'Insufficient space. Reselect.')
                     break
+                targets = board.targets_in(mask)
                 # Append to global lists for drawing images in game window.
-                ui.DisplayData.IMAGES.append(ship.image)
-                ui.DisplayData.POSITIONS.append(target.box)
+                ui.DisplayData.add_image(ship.image, target.box)
 
                 ship.deploy(targets)
                 for target in targets:
@@ -373,92 +502,39 @@ def place_ship(board: Board, fleet, rotate=False) -> bool:
 
 
 def place_random(board, fleet):
+    """Places each ship at a random legal position drawn from the board's placement table."""
     for ship in fleet:
-        # 50% chance to rotate image.
-        if rd.randint(0, 1):
-            ship.image = pg.transform.rotate(ship.image, 90)
-
-        placing = True
-        while placing:
-            target = board.select_target(random=True)
-            vertical = ship.image.get_width() < ship.image.get_height()
-
-            if vertical:
-                positions = [Target.convert_coord(target.x, target.y + y) for y in range(ship.size)]
-            else:
-                positions = [Target.convert_coord(target.x + x, target.y) for x in range(ship.size)]
-
-            lg.debug(f'place_random: ship={ship.type}, target={target}, positions={positions}')
-            attempt_remaining = True
-            while True:
-                try:
-                    targets = [board.positions[pos] for pos in positions]
-                except KeyError:
-                    if attempt_remaining:
-                        attempt_remaining = False
-                        positions = reattempt_placement(target, ship)
-                        continue
-                    else:
-                        lg.info(f'Insufficient space. Reselecting...')
-                        break
-                else:
-                    pos_occupied = [target.occupied for target in targets]
-                    if any(pos_occupied):
-                        if attempt_remaining:
-                            attempt_remaining = False
-                            positions = reattempt_placement(target, ship)
-                            continue
-                        else:
-                            lg.info(f'Insufficient space. Reselecting...')
-                            break
-                    # Appends to global lists if player selected random placement.
-                    if board.player.name.startswith('Player'):
-                        ui.DisplayData.IMAGES.append(ship.image)
-                        ui.DisplayData.POSITIONS.append(target.box)
-
-                    ship.deploy(targets)
-                    for target in targets:
-                        target.ship = ship
-                        target.reset()
-                    try:
-                        assert len(ship.position) == ship.size
-                    except AssertionError:
-                        lg.error(f'{ship.type.upper()} PLACEMENT ERROR. ({board.player})')
-                        lg.error(f'place_random: target.ship.position={target.ship.position}')
-                    else:
-                        placing = False
-                        break
-
-
-def reattempt_placement(target, ship) -> list:
-    """Rotate ship image and regenerate position list."""
-    lg.info(f'No space. Rotating. Reattempting...')
-    ship.image = pg.transform.rotate(ship.image, 90)
-    vertical = ship.image.get_width() < ship.image.get_height()
-    if vertical:
-        positions = [Target.convert_coord(target.x, target.y + y) for y in range(ship.size)]
-    else:
-        positions = [Target.convert_coord(target.x + x, target.y) for x in range(ship.size)]
-    return positions
+        placement = board.placements.sample(ship.size, board.state.occupied, board.rng)
+        if placement is None:
+            lg.error(f'{ship.type.upper()} PLACEMENT ERROR. ({board.player})')
+            continue
+        mask, vertical = placement
+        ship.facing = vs.Align.VERTICAL if vertical else vs.Align.HORIZONTAL
+
+        targets = board.targets_in(mask)
+        lg.debug(f'place_random: ship={ship.type}, positions={targets}')
+        # Appends to global lists if player selected random placement.
+        if board.player.name.startswith('Player') and board.viewport is None and not ui.Display.HEADLESS:
+            ui.DisplayData.add_image(ship.image, targets[0].box)
+
+        ship.deploy(targets)
+        for target in targets:
+            target.ship = ship
+            target.reset()
 
 
 def remove_ship(board: Board, target: Target):
     if target is not None:
         if target.occupied:
             ship = target.ship
+            # Remove image from global lists for drawing. Ships of the same type share an image.
+            ui.DisplayData.remove_image(ship.position[0].box)
 
             for position in ship.position:
                 # Reset Target object attributes.
                 position.ship = None
-                # Remove position from global list for drawing.
-                if position.box in ui.DisplayData.POSITIONS:
-                    ui.DisplayData.POSITIONS.remove(position.box)
-
-            for target in ship.position:
-                target.reset()
+                position.reset()
             ship.position.clear()  # Reset Vessel object attribute.
-            if ship.image in ui.DisplayData.IMAGES:
-                ui.DisplayData.IMAGES.remove(ship.image)  # Remove image from global.
             lg.info(f"Removed {board.player}'s {ship.type}({ship.name}) @ {target}.")
 
             try:
@@ -473,7 +549,7 @@ def clear_ships(board: Board):
     """Clear all targets on the board."""
     ui.DisplayData.IMAGES.clear()
     ui.DisplayData.POSITIONS.clear()
-    for target in board.positions.values():
+    for target in board.targets_in(board.state.occupied):
         if target.ship:
             target.ship.redeploy()
             target.ship.special.reset()
@@ -485,10 +561,12 @@ def clear_boards(boards: list[Board]):
     """Resets both boards, all ships and messages."""
     for board in boards:
         clear_ships(board)
-        for target in board.positions.values():
+        for target in board.targets:
             target.reset()
+        board.state.clear_results()
+        board.shots = 0
 
-    for msg in ui.DisplayData.get_messages():
+    for msg in ui.DisplayData.messages():
         msg.text = '' if msg is not ui.DisplayData.TITLE_MSG else msg.text
 
     ui.DisplayData.PLAYER_MSG.text = 'PLAYER'
@@ -496,24 +574,22 @@ def clear_boards(boards: list[Board]):
     ui.DisplayData.TURN_MSG.text = 'TURN 1'
 
 
-def victory(player_fleet: list[vs.Vessel], enemy_fleet: list[vs.Vessel]) -> bool:
+def victory(player_status: vs.FleetStatus, enemy_status: vs.FleetStatus) -> bool:
     """
     Checks if all players' ships are sunk.
     Returns boolean to continue/break main loop.
     """
     end_game = False
 
-    if all([ship.sunk for ship in player_fleet]):
+    if player_status.defeated:
         ui.DisplayData.END_MSG.text = 'DEFEAT. All player ships sunk...'
-        defeat_sound = pg.mixer.Sound('Sounds/dies-irae.wav')
-        defeat_sound.play()
-        pg.time.delay(1000)
+        Effects.play('defeat')
+        Effects.pause()
         end_game = True
-    elif all([ship.sunk for ship in enemy_fleet]):
+    elif enemy_status.defeated:
         ui.DisplayData.END_MSG.text = 'VICTORY! All enemy ships sunk!'
-        victory_sound = pg.mixer.Sound('Sounds/victory-fanfare.wav')
-        victory_sound.play()
-        pg.time.delay(1000)
+        Effects.play('victory')
+        Effects.pause()
         end_game = True
 
     return end_game
@@ -533,13 +609,17 @@ def fire(board: Board, target=None, comp_fire=0, multi=False) -> bool:
     if target is not None:
         if not target.checked:
             launched = True
+            board.shots += 1
             if not multi:  # Skip launch sound effect during multiple shots to minimize lag.
-                Target.LAUNCH_SOUND.play()
-                pg.time.delay(1000)
-            if target.attack():
+                Effects.play(Target.LAUNCH_SOUND)
+                Effects.pause()
+            hit = target.attack()
+            if board.recorder is not None:
+                board.recorder.shot(board, target, (hit and target.ship.sunk) + hit)
+            if hit:
                 # Ship has been hit at the selected target.
-                Target.HIT_SOUND.play()
-                pg.time.delay(1000)
+                Effects.play(Target.HIT_SOUND)
+                Effects.pause()
                 ship: vs.Vessel = target.ship
                 # Trigger any applicable passive skills.
                 Special.trigger_passive(ship, board)
@@ -549,35 +629,57 @@ def fire(board: Board, target=None, comp_fire=0, multi=False) -> bool:
                         board.DETECTED = None
                     board.target_locked = True
                 if ship.sunk:
-                    Target.SINK_SOUND.play()
-                    pg.time.delay(1000)
+                    Effects.play(Target.SINK_SOUND)
+                    Effects.pause()
                     ship.special.downtime = -1  # Sets 'ready' attribute to False.
                     board.target_locked = False
+                    board.state.sink(ship.mask, ship.size)
                     # Ensure sunk ship indicates hit. Color may not be set due to Submarine repositioning.
                     for tgt in ship.position:
-                        tgt.result = 'HIT'
-                    if not comp_fire:
+                        board.state.mark_hit(tgt.index)
+                        Effects.show(tgt.paint)
+                    if board.reveal_sunk and not (comp_fire or ui.Display.HEADLESS or board.viewport):
                         # Reveal ship on the opponent's board.
-                        ui.DisplayData.IMAGES.append(ship.image)
-                        ui.DisplayData.POSITIONS.append(ship.position[0].box)
+                        Effects.show(partial(ui.DisplayData.add_image, ship.image, ship.position[0].box))
             # else:  # Target missed
             #     if not multi:  # Skip miss sound effect during multiple shots to minimize lag.
         else:
             lg.info(f'Target checked. ({target.result} @ {target})')
             if target is board.DETECTED:
                 board.DETECTED = None  # Prevent infinite looping
-    pg.display.flip()
+    ui.Frame.update()
     return launched
 
 
+def comp_turn(board: Board, comp_fleet: list[vs.Vessel], comp_level: int) -> bool:
+    """
+    Comp activates a ready Special or fires at the opponent's board.
+    Returns boolean to indicate the turn has ended.
+    """
+    activated = Special.charge(board, comp_fleet=tuple(comp_fleet))
+    if activated:
+        return Special.discharge(board, activated, comp_fire=comp_level)
+    return fire(board, board.DETECTED, comp_fire=comp_level)
+
+
 def switch_players(grid_data: list[list], game: gb.GameFlow):
-    """Alternate turns and update messages. Redraw the game window."""
+    """Alternate turns and update messages once the effects of the turn have played. Redraw the game window."""
+    Effects.show(partial(show_turn, game.state, game.turn))
+
+    # Draw the game boards.
+    ui.draw_grids(*grid_data)
+    # Draw ships and messages.
+    ui.DisplayData.draw()
+    ui.Frame.update()
+
+
+def show_turn(state: State, turn: int):
+    """Moves the results of the turn that ended in 'state' to the messages of the player that took it."""
     # Messages updated for the player's turn.
-    if game.state is State.COMP:
+    if state is State.COMP:
         ui.DisplayData.PLAYER_MSG.text = f'{ui.DisplayData.SKILL_INTER.text}'
         ui.DisplayData.P_TGT_MSG.text = f'{ui.DisplayData.TARGET_INTER.text}'
         ui.DisplayData.ACTION_MSG.text = 'Left-click to select a target --- OR --- Select a ship to activate special'
-        Special.turnover()
 
     # Messages updated for the player's turn.
     else:
@@ -585,15 +687,19 @@ def switch_players(grid_data: list[list], game: gb.GameFlow):
         ui.DisplayData.C_TGT_MSG.text = f'{ui.DisplayData.TARGET_INTER.text}'
 
     # Update common messages
-    ui.DisplayData.TURN_MSG.text = f'TURN {game.turn}'
+    ui.DisplayData.TURN_MSG.text = f'TURN {turn}'
     ui.DisplayData.TARGET_INTER.text = ''
     ui.DisplayData.SKILL_INTER.text = ''
 
-    # Draw the game boards.
-    ui.draw_grids(*grid_data)
-    # Draw ships and messages.
-    ui.DisplayData.draw()
-    pg.display.flip()
+
+SCROLL_KEYS = {pg.K_LEFT: (-1, 0), pg.K_RIGHT: (1, 0), pg.K_UP: (0, -1), pg.K_DOWN: (0, 1)}
+
+
+def hovered_view(boards) -> ui.Viewport:
+    """Returns the Viewport of the board under the mouse."""
+    for board in boards:
+        if board.viewport is not None and board.viewport.rect.collidepoint(ui.Pointer.POS):
+            return board.viewport
 
 
 @Log.call_log
@@ -601,6 +707,7 @@ def start_screen(game: gb.GameFlow, clock):
     game.break_flow(State.START)
     while game.state is State.START:
         clock.tick(ui.Display.FPS)
+        ui.Pointer.update()
         ui.DisplayData.draw_start()
         start_btn = ui.DisplayData.START_BUTTON
 
@@ -626,25 +733,35 @@ def start_screen(game: gb.GameFlow, clock):
         pg.display.flip()
 
 
-def main():
-    """This is the main game loop."""
+def main(grid_size=Board.GRID_SIZE, seed: int = None, level=3):
+    """
+    This is the main game loop. The Comp plays at the difficulty level (1 to 4).
+    Boards larger than the default are shown in scrolling Viewports, and their fleets are placed randomly.
+    The Comp's play and the outcome of skills are reproducible for a given seed and the same inputs.
+    """
+    ui.init()
+    sb.SoundBank.preload('defeat', 'victory')  # Long tracks, loaded before the game instead of when it ends.
     # Track game progression.
     clock = pg.time.Clock()
     game = gb.GameFlow()
     ui.DisplayData.TURN_MSG.text = 'TURN 1'
+    large = grid_size > Board.GRID_SIZE
+    copies = fleet_copies(grid_size)
 
     start_screen(game, clock)
 
-    # Create Player and Comp.
-    player1 = gb.Player()
-    player1.set_opponent(gb.Comp(difficulty=3))
+    # Create Player and Comp. Both draw from one random number generator.
+    rng = rd.Random(seed)
+    player1 = gb.Player(rng)
+    player1.set_opponent(gb.Comp(difficulty=level, rng=rng))
 
     # Create Player board.
     board1 = Board(player1)
-    board1.init_targets(sqr_size=45, grid_pos=(ui.Display.WIDTH / 2 + 80, 100))
+    board1.init_targets(sqr_size=45, grid_size=grid_size, grid_pos=(ui.Display.WIDTH / 2 + 80, 100))
+    board1.remark_hits = True  # The player keeps track of the damage on their own ships.
 
     # Create Player ships.
-    player_fleet = deploy_fleet(board1, player1)
+    player_fleet = deploy_fleet(board1, player1, copies, game.skills)
 
     # Set opponent.
     player2 = player1.opp
@@ -652,15 +769,21 @@ def main():
 
     # Create Comp board.
     board2 = Board(player2)
-    board2.init_targets(sqr_size=45, grid_pos=(70, 100))
+    board2.init_targets(sqr_size=45, grid_size=grid_size, grid_pos=(70, 100))
+    board2.reveal_sunk = True
+
+    if large:
+        for board in (board1, board2):
+            board.viewport = ui.Viewport((*board.GRID_POS, 460, 460), grid_size)
+        ui.Frame.VIEWS = [board1.viewport, board2.viewport]
 
     # Create Comp ships.
-    deploy_fleet(board2, player2)
+    deploy_fleet(board2, player2, copies, game.skills)
     enemy_fleet = list(player2.fleet.values())
     place_random(board2, enemy_fleet)
 
     # Organize grid data for passing to the interface. Show initial setup instructions.
-    grid_data = [board1.grid, board2.grid, board1.headers, board2.headers]
+    grid_data = [[], [], [], []] if large else [board1.grid, board2.grid, board1.headers, board2.headers]
     ui.DisplayData.RESULT_MSG.text = 'Left-click to place ship on the grid. --- Right-click on ship to remove it.'
     ui.DisplayData.ACTION_MSG.text = 'BACKSPACE to clear all ships. -- ENTER to place all randomly.-- ' \
                                      'SPACEBAR to rotate 90 degrees.'
@@ -668,18 +791,23 @@ def main():
     activated = None  # Ship selected for activating Special.
     while game.state is not State.QUIT:
         clock.tick(ui.Display.FPS)
-
-        if game.state is State.COMP:
-            activated = Special.charge(board2, comp_fleet=tuple(enemy_fleet))
-            if activated:
-                turn_end = Special.discharge(board1, activated, comp_fire=player2.level)
-                activated = None
-            else:
-                turn_end = fire(board1, board1.DETECTED, comp_fire=player2.level)
+        ui.Pointer.update()
+        Effects.SEQUENCE.advance()
+
+        if large and game.state is State.SETUP:
+            # Large fleets are always placed randomly.
+            clear_ships(board1)
+            place_random(board1, player_fleet)
+            ui.DisplayData.RESULT_MSG.text = 'Player fleet deployed. Ready to attack...'
+            ui.DisplayData.ACTION_MSG.text = 'Left-click to select a target --- Scroll to zoom, arrow keys to pan'
+            game.progress_flow(start=State.PLAY)
+
+        # Turns wait for the effects of the previous turn to finish playing.
+        if game.state is State.COMP and not Effects.busy():
+            turn_end = comp_turn(board1, enemy_fleet, player2.level)
             if turn_end:
                 switch_players(grid_data, game)
                 game.progress_flow()
-                Special.check_ready(player_fleet)
 
         for event in pg.event.get():
             if event.type == pg.QUIT:
@@ -690,9 +818,9 @@ def main():
                 if event.button == 1 and ui.mouse_over(ui.DisplayData.INFO_BUTTON):
                     webbrowser.open_new_tab(os.path.join('Misc', 'info.html'))
 
-                if game.state is State.PLAY:
+                if game.state is State.PLAY and not Effects.busy():
                     if event.button == 1:  # LEFT-CLICK
-                        Special.check_ship(board1.grid, player_fleet)
+                        Special.check_ship(board1, player_fleet)
                         activated = Special.charge(board1, activated)
                         turn_end = fire(board2)
                         if turn_end:
@@ -719,9 +847,20 @@ def main():
                         pos = board1.select_target()
                         remove_ship(board1, pos)
 
+            elif event.type == pg.MOUSEWHEEL and large:
+                view = hovered_view((board1, board2))
+                if view is not None:
+                    view.zoom(event.y, around=ui.Pointer.POS)
+
             elif event.type == pg.KEYDOWN:
                 keys_pressed = pg.key.get_pressed()
 
+                if large and event.key in SCROLL_KEYS:
+                    view = hovered_view((board1, board2))
+                    if view is not None:
+                        step = max(1, min(view.span) // 4)
+                        view.scroll(*(d * step for d in SCROLL_KEYS[event.key]))
+
                 # Displays window when game ends until any key is pressed.
                 if game.state is State.END:
                     if keys_pressed[pg.K_ESCAPE]:
@@ -750,22 +889,239 @@ def main():
 
         # Draw the game boards.
         ui.draw_grids(*grid_data)
+        if large:
+            mouse_pos = ui.Pointer.POS
+            board1.viewport.update(board1.cell_colors(reveal_ships=True), mouse_pos)
+            board2.viewport.update(board2.cell_colors(), mouse_pos)
         # Draw ships and messages.
         ui.DisplayData.draw()
         # Display ship when placing fleet.
         if game.state is State.SETUP:
-            ships = [ship.image for ship in player_fleet if ship.image not in ui.DisplayData.IMAGES]
-            ui.draw_images([ships[0]], [pg.mouse.get_pos()])
-        pg.display.flip()
+            ships = [ship.image for ship in player_fleet if not ship.position]
+            ui.draw_images([ships[0]], [ui.Pointer.POS])
+        ui.Frame.update()
 
-        if game.state is State.WAIT:
+        if game.state is State.WAIT and not Effects.busy():
             # Check for victory conditions.
-            if victory(player_fleet, enemy_fleet):
+            if victory(player1.status, player2.status):
                 game.break_flow(State.END)
                 ui.DisplayData.ACTION_MSG.text = 'Press ESC to exit game --- OR --- Press SPACEBAR to play again'
             else:
                 game.progress_flow()
+                if game.state is State.PLAY:  # Cooldowns have advanced to the new turn.
+                    Special.check_ready(player1.status)
+
+    lg.info('GAME END. Thank you for playing!')
+
+
+# ========== ONLINE GAME ==========
+
+def online_boards(welcome) -> tuple[list[Board], list[vs.Vessel]]:
+    """Creates the boards of an online game, with the player's fleet where the server placed it."""
+    grid_size = welcome.grid_size
+    player, opponent = gb.Player(), gb.Player()
+    player.set_opponent(opponent)
+    opponent.set_opponent(player)
+
+    boards = [Board(player), Board(opponent)]
+    boards[0].init_targets(sqr_size=45, grid_size=grid_size, grid_pos=(ui.Display.WIDTH / 2 + 80, 100))
+    boards[1].init_targets(sqr_size=45, grid_size=grid_size, grid_pos=(70, 100))
+    if grid_size > Board.GRID_SIZE:
+        for board in boards:
+            board.viewport = ui.Viewport((*board.GRID_POS, 460, 460), grid_size)
+        ui.Frame.VIEWS = [board.viewport for board in boards]
+
+    fleet = deploy_fleet(boards[0], player, fleet_copies(grid_size))
+    for record in welcome.ships:
+        show_ship(boards[0], fleet[record.ship], record.cell, record.vertical)
+    return boards, fleet
+
+
+def show_ship(board: Board, ship: vs.Vessel, cell: int, vertical: bool):
+    """Moves one of the player's ships to where the server placed it, keeping the shot results."""
+    if ship.position:
+        ui.DisplayData.remove_image(ship.position[0].box)
+        for target in ship.position:
+            target.ship = None
+    ship.facing = vs.Align.VERTICAL if vertical else vs.Align.HORIZONTAL
+    targets = board.targets_in(board.span(board.targets[cell], ship.size, vertical))
+    ship.deploy(targets)
+    for target in targets:
+        target.ship = ship
+    if board.viewport is None:
+        ui.DisplayData.add_image(ship.image, targets[0].box)
 
+
+def show_delta(boards: list[Board], fleet: list[vs.Vessel], delta) -> list[str]:
+    """
+    Applies a delta from the server to the player's (OWN) and opponent's (ENEMY) boards.
+    Returns a description of the shots at each board.
+    """
+    import bsnet as net
+    changed = net.apply(delta, [board.state for board in boards])
+    for board, cells in zip(boards, changed):
+        for target in board.targets_in(cells):
+            target.paint()
+
+    for record in delta.ships:
+        if record.board == net.OWN:
+            show_ship(boards[0], fleet[record.ship], record.cell, record.vertical)
+        elif boards[1].viewport is None:
+            # Reveal the sunk ship on the opponent's board.
+            ship = FLEET[record.ship % len(FLEET)]()
+            ship.sqr_size = boards[1].SQR_SIZE
+            ship.facing = vs.Align.VERTICAL if record.vertical else vs.Align.HORIZONTAL
+            ui.DisplayData.add_image(ship.image, boards[1].targets[record.cell].box)
+
+    results = []
+    for board, side in zip(boards, (net.OWN, net.ENEMY)):
+        # Only cells whose bit was set by the move; cleared cells are not shots.
+        new = {mask: delta.masks.get((side, mask), 0) & getattr(board.state, name)
+               for mask, name in enumerate(net.MASKS)}
+        if new[net.SUNK]:
+            results.append('Ship SUNK!')
+        else:
+            results.append(' '.join(f'{result} @ {", ".join(t.name for t in board.targets_in(new[mask]))}'
+                                    for result, mask in (('HIT', net.HITS), ('MISS', net.MISSES)) if new[mask]))
+        if side == net.ENEMY and (new[net.SUNK] or new[net.HITS]):
+            Effects.play(Target.SINK_SOUND if new[net.SUNK] else Target.HIT_SOUND)
+
+    if delta.detected != net.NO_CELL:
+        # The player's Destroyer was hit and pinged an enemy Submarine (see Special.sonar_blast).
+        detected = boards[1].targets[delta.detected]
+        detected.box.flash = True
+        results[0] = f'{results[0]} Submarine detected @ {detected}!'.strip()
+        Effects.play('sonar')
+    return results
+
+
+def online(address: str):
+    """
+    Plays against another player through a game server (see bsnet). The server resolves every
+    shot and Special, and the boards here show the deltas it sends back. The connection runs on
+    a background thread, so the render loop never waits on the network.
+    """
+    import bsnet as net
+    host, _, port = address.rpartition(':')
+    host, port = host or 'localhost', int(port or net.PORT)
+    ui.init()
+    sb.SoundBank.preload('defeat', 'victory')
+    clock = pg.time.Clock()
+    client = net.Client(host, port).start()
+
+    ui.DisplayData.PLAYER_MSG.text = 'PLAYER'
+    ui.DisplayData.COMP_MSG.text = 'OPPONENT'
+    ui.DisplayData.RESULT_MSG.text = f'Connecting to {host}:{port}... Waiting for an opponent.'
+    boards, fleet = [], []
+    grid_data = [[], [], [], []]
+    side = None
+    my_turn = False  # True while the server waits for this player's move.
+    ready = 0  # Ships whose Special can be activated (bit per ship in fleet order).
+    activated = None  # Ship selected for activating Special.
+    ended = False  # The server reported the end of the game.
+    running = True
+    while running:
+        clock.tick(ui.Display.FPS)
+        ui.Pointer.update()
+        Effects.SEQUENCE.advance()
+
+        for message in client.poll():
+            if isinstance(message, net.Welcome):
+                side = message.side
+                boards, fleet = online_boards(message)
+                large = message.grid_size > Board.GRID_SIZE
+                grid_data = [[], [], [], []] if large else \
+                    [boards[0].grid, boards[1].grid, boards[0].headers, boards[1].headers]
+            elif isinstance(message, net.Delta):
+                own_result, enemy_result = show_delta(boards, fleet, message)
+                ui.DisplayData.P_TGT_MSG.text = enemy_result or ui.DisplayData.P_TGT_MSG.text
+                ui.DisplayData.C_TGT_MSG.text = own_result or ui.DisplayData.C_TGT_MSG.text
+                ui.DisplayData.TURN_MSG.text = f'TURN {message.turn}'
+                my_turn, ready = message.side == side, message.ready
+                if my_turn:
+                    ui.DisplayData.RESULT_MSG.text = 'Your turn.'
+                    ui.DisplayData.ACTION_MSG.text = \
+                        'Left-click to select a target --- OR --- Select a ship to activate special'
+                else:
+                    ui.DisplayData.RESULT_MSG.text = "Opponent's turn..."
+            elif isinstance(message, net.Reject):
+                ui.DisplayData.RESULT_MSG.text = net.REASONS[message.reason]
+                # The server still waits for a move unless the game moved on.
+                my_turn = message.reason in (net.CHECKED, net.NOT_READY, net.INVALID)
+            elif isinstance(message, net.End):
+                won = message.winner == side
+                if message.winner == net.NO_WINNER:
+                    ui.DisplayData.END_MSG.text = 'GAME OVER.'
+                elif not won:
+                    ui.DisplayData.END_MSG.text = 'DEFEAT. All player ships sunk...'
+                elif boards[1].state.sunk.bit_count() < sum(ship.size for ship in fleet):
+                    ui.DisplayData.END_MSG.text = 'VICTORY! Opponent left the game.'
+                else:
+                    ui.DisplayData.END_MSG.text = 'VICTORY! All enemy ships sunk!'
+                Effects.play('victory' if won else 'defeat')
+                ui.DisplayData.ACTION_MSG.text = 'Press ESC to exit game'
+                my_turn, side, ended = False, None, True
+            elif isinstance(message, net.Closed) and not ended:
+                # Refused or dropped, before or during the game. The end of the game keeps its message.
+                ui.DisplayData.RESULT_MSG.text = f'Disconnected from the server. {message.error}'
+                ui.DisplayData.ACTION_MSG.text = 'Press ESC to exit game'
+                my_turn, side = False, None
+
+        for event in pg.event.get():
+            if event.type == pg.QUIT:
+                running = False
+
+            elif event.type == pg.MOUSEBUTTONDOWN and my_turn and not Effects.busy():
+                target = boards[1].select_target()
+                if event.button == 1:  # LEFT-CLICK
+                    if activated:
+                        Special.restore_data(activated)
+                        activated = None
+                    if target is not None and target.checked:
+                        ui.DisplayData.RESULT_MSG.text = f'Target checked. ({target.result} @ {target})'
+                    elif target is not None:
+                        client.fire(target.index)
+                        Effects.play(Target.LAUNCH_SOUND)
+                        my_turn = False
+                    else:
+                        own = boards[0].select_target()
+                        if own is not None and own.ship in fleet:
+                            if ready >> fleet.index(own.ship) & 1:
+                                activated = own.ship
+                                Special.prep_data(activated)
+                                ui.DisplayData.ACTION_MSG.text += ' (Right-click on target to fire.)'
+                            else:
+                                ui.DisplayData.RESULT_MSG.text = f'{own.ship.special} is not ready.'
+
+                elif event.button == 3 and activated and target is not None:  # RIGHT-CLICK
+                    client.skill(fleet.index(activated), target.index)
+                    Special.restore_data(activated)
+                    activated = None
+                    my_turn = False
+
+            elif event.type == pg.MOUSEWHEEL and boards:
+                view = hovered_view(boards)
+                if view is not None:
+                    view.zoom(event.y, around=ui.Pointer.POS)
+
+            elif event.type == pg.KEYDOWN:
+                if event.key == pg.K_ESCAPE and side is None:
+                    running = False
+                elif event.key in SCROLL_KEYS and boards:
+                    view = hovered_view(boards)
+                    if view is not None:
+                        step = max(1, min(view.span) // 4)
+                        view.scroll(*(d * step for d in SCROLL_KEYS[event.key]))
+
+        ui.draw_grids(*grid_data)
+        if boards and boards[0].viewport is not None:
+            mouse_pos = ui.Pointer.POS
+            boards[0].viewport.update(boards[0].cell_colors(reveal_ships=True), mouse_pos)
+            boards[1].viewport.update(boards[1].cell_colors(), mouse_pos)
+        ui.DisplayData.draw()
+        ui.Frame.update()
+
+    client.close()
     lg.info('GAME END. Thank you for playing!')
 
 
@@ -784,7 +1140,7 @@ class Special(gb.GameSkill):
                           'cooldown': 1,
                           'chance': 100,
                           'func': 'missile_salvo',
-                          'sound': pg.mixer.Sound('Sounds/rapid-missile-launch.wav')
+                          'sound': 'salvo'
                           },
               'Destroyer': {'info': '(PASSIVE) %-chance to counter-detect a submarine after being hit.',
                             'name': 'Sonar Blast',
@@ -792,7 +1148,7 @@ class Special(gb.GameSkill):
                             'cooldown': -1,
                             'chance': 75,
                             'func': 'sonar_blast',
-                            'sound': pg.mixer.Sound('Sounds/sonar2.wav')
+                            'sound': 'sonar'
                             },
               'Submarine': {'info': '(PASSIVE) %-chance to evade detection after being hit.',
                             'name': 'Countermeasures',
@@ -800,7 +1156,7 @@ class Special(gb.GameSkill):
                             'cooldown': -1,
                             'chance': 75,
                             'func': 'countermeasures',
-                            'sound': pg.mixer.Sound('Sounds/submarine-travel.mp3')
+                            'sound': 'dive'
                             },
               'Frigate': {'info': 'Deploys charge with a %chance to hit a submarine. (max 3 charges)',
                           'name': 'Depth Charge',
@@ -808,7 +1164,7 @@ class Special(gb.GameSkill):
                           'cooldown': 2,
                           'chance': 100,
                           'func': 'depth_charge',
-                          'sound': pg.mixer.Sound('Sounds/depth.wav')
+                          'sound': 'depth_charge'
                           },
               'Carrier': {'info': "Fires shot perpendicular to ship's orientation across entire row/column.",
                           'name': 'EM Railgun',
@@ -816,16 +1172,18 @@ class Special(gb.GameSkill):
                           'cooldown': 6,
                           'chance': 100,
                           'func': 'em_railgun',
-                          'sound': pg.mixer.Sound('Sounds/railgun.mp3')
+                          'sound': 'railgun'
                           }
               }
 
-    def __init__(self, ship: vs.Vessel):
+    def __init__(self, ship: vs.Vessel, scheduler: gb.SkillScheduler = None):
         args = self.SKILLS[ship.type]
         super().__init__(name=args['name'],
                          description=args['info'],
                          cooldown=args['cooldown'],
-                         success_rate=args['chance']
+                         success_rate=args['chance'],
+                         rng=ship.rng,
+                         scheduler=scheduler
                          )
         self.func = getattr(Special, args['func'])
         self.sound = args['sound']
@@ -834,11 +1192,22 @@ class Special(gb.GameSkill):
         self._type = args['type']
         if args['type'] is SkType.PASSIVE:
             self.disable_ready()
+        self._ready_changed()
 
     @Log.call_log
     def __call__(self, *args, **kwargs):
         self.activate(*args, **kwargs)
 
+    def _ready_changed(self):
+        # Only skills the player activates count as ready in the fleet status.
+        if self._ship.status is not None:
+            self._ship.status.set_ready(self._ship, self.ready and self._type is SkType.INSTANT)
+
+    def on_activate(self, skill, board: Board, target: Target = None):
+        # Arguments of 'func', which is unbound: 'skill' is this Special.
+        if board.recorder is not None:
+            board.recorder.skill(board, self.ship, target)
+
     def check(self):
         ship = self.ship
         if ship.sunk:
@@ -875,9 +1244,8 @@ class Special(gb.GameSkill):
 
         # Return random selection for the Comp player
         if comp_fleet:
-            ready = [ship for ship in list(comp_fleet)
-                     if all([ship.special.ready, ship.special.type is SkType.INSTANT, not ship.sunk])]
-            return rd.choice(ready) if ready else None
+            ready = comp_fleet[0].status.ready_ships()
+            return board.rng.choice(ready) if ready else None
 
         # Player selects target from the board
         else:
@@ -919,7 +1287,7 @@ class Special(gb.GameSkill):
     @staticmethod
     def discharge(board: Board, ship=None, comp_fire=0) -> bool:
         launched = False
-        comp_chance = rd.randint(1, 100) < comp_fire * 25
+        comp_chance = board.rng.randint(1, 100) < comp_fire * 25
         if ship:
             if comp_fire and comp_chance:
                 if board.DETECTED:
@@ -957,16 +1325,14 @@ class Special(gb.GameSkill):
             ship.special(ship.special, *args, **kwargs)
 
     @staticmethod
-    def check_ship(grid: list[ui.Box], fleet: list[vs.Vessel]):
-        hover_box = ui.get_mouse_over(grid)
-        for ship in fleet:
-            positions = [target.box for target in ship.position]
-            if hover_box in positions:
-                ship.special.check()
+    def check_ship(board: Board, fleet: list[vs.Vessel]):
+        target = board.select_target()
+        if target is not None and target.ship in fleet:
+            target.ship.special.check()
 
     @staticmethod
-    def check_ready(fleet: list[vs.Vessel]):
-        ready_list = [f' {ship.special} ({ship.type})' for ship in fleet if (ship.special.ready and not ship.sunk)]
+    def check_ready(status: vs.FleetStatus):
+        ready_list = [f' {ship.special} ({ship.type})' for ship in status.ready_ships()]
         if ready_list:
             ui.DisplayData.RESULT_MSG.text = f'SKILLS READY: {str(ready_list)[1:-1]}'
 
@@ -978,8 +1344,8 @@ class Special(gb.GameSkill):
             targets = board.select_row(origin)
         else:
             targets = board.select_column(origin)
-        self.sound.play()
-        pg.time.delay(1000)
+        Effects.play(self.sound)
+        Effects.pause()
         for target in targets:
             _ = fire(board, target=target, multi=True)
 
@@ -995,8 +1361,8 @@ class Special(gb.GameSkill):
                 targets.append(add_target)
                 origin = add_target
 
-        self.sound.play()
-        pg.time.delay(1000)
+        Effects.play(self.sound)
+        Effects.pause()
         for target in targets:
             _ = fire(board, target=target, multi=True)
 
@@ -1004,13 +1370,11 @@ class Special(gb.GameSkill):
         """75% chance to counter-detect a submarine after being hit."""
         opp_board: Board = board.player.opp.board
         if not self.ship.sunk:
-            occ_targets = [target for target in opp_board.positions.values() if target.occupied]
-            sub_targets = [target for target in occ_targets
-                           if all([target.ship.type == 'Submarine', not target.ship.sunk, not target.checked])]
+            sub_targets = opp_board.targets_in(opp_board.state.fleet.of_class(vs.Submarine))
             if sub_targets:
-                self.sound.play()
-                pg.time.delay(1000)
-                detected = rd.choice(sub_targets)
+                Effects.play(self.sound)
+                Effects.pause()
+                detected = self.rng.choice(sub_targets)
                 detected.box.flash = True
                 ui.DisplayData.SKILL_INTER.text = f'{detected.ship} detected @ {detected.box.name}!'
                 ui.DisplayData.RESULT_MSG.text = 'ACTIVE PING!'
@@ -1021,20 +1385,22 @@ class Special(gb.GameSkill):
         if not self.ship.sunk:
             remove_ship(board, self.ship.position[0])
             place_random(board, [self.ship])
-            self.sound.play()
-            pg.time.delay(1000)
+            Effects.play(self.sound)
+            Effects.pause()
 
             # Track number of hits accumulated on player ship or sunken ship
-            if board.player.name.startswith('Player'):
+            if board.remark_hits:
                 for p in range(self.ship.damage):
                     self.ship.position[p].result = 'HIT'
+                    board.remarked |= 1 << self.ship.position[p].index
+            if board.recorder is not None:
+                board.recorder.relocate(board, self.ship, board.remark_hits)
 
             # Reset miss tracker
             ui.DisplayData.SKILL_INTER.text = f'Dive! Dive! Launching countermeasures!'
             ui.DisplayData.RESULT_MSG.text = 'RADAR JAMMED!'
-            for target in board.positions.values():
-                if target.result == 'MISS':
-                    target.reset()
+            for target in board.targets_in(board.state.misses):
+                target.reset()
         else:
             for target in self.ship.position:  # Sets box color, but remains unchecked.
                 target.box.color2 = Target.HIT_COLOR  # All ship positions may still be targeted by opponent.
@@ -1043,17 +1409,15 @@ class Special(gb.GameSkill):
         """Deploys charge with (10 * n-charges)% chance to hit a submarine. (max 50% [5 charges])"""
         # Deploy charge.
         if not self.ship.sunk:
-            occ_targets = [target for target in board.positions.values() if target.occupied]
-            sub_targets = [target for target in occ_targets
-                           if all([target.ship.type == 'Submarine', not target.ship.sunk, not target.checked])]
+            sub_targets = board.targets_in(board.state.fleet.of_class(vs.Submarine))
             if sub_targets:
                 self.stacks += int(self.stacks < 3)  # Add 1 stack unless max stacks
                 chance = 10 * self.stacks
                 ui.DisplayData.SKILL_INTER.text = f'Depth charges deployed. (Total: {self.stacks})'
-                detected = rd.choice(sub_targets)
+                detected = self.rng.choice(sub_targets)
                 if self.roll_success(chance=chance):
-                    self.sound.play()
-                    pg.time.delay(1000)
+                    Effects.play(self.sound)
+                    Effects.pause()
                     _ = fire(board, target=detected, multi=True)
                     self.stacks -= 1
                     ui.DisplayData.SKILL_INTER.text = f'Depth charge detonated @ {detected.box.name}!'
@@ -1064,4 +1428,23 @@ class Special(gb.GameSkill):
 # ========== CALL MAIN FUNCTION ==========
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Project BattleShip')
+    parser.add_argument('--fast', action='store_true', help='play effects without waiting between them')
+    parser.add_argument('--profile', action='store_true', help='print call timings of the game functions on exit')
+    parser.add_argument('--grid', type=int, default=Board.GRID_SIZE, metavar='N',
+                        help=f'play on N x N boards (up to {Board.MAX_GRID_SIZE}) with a larger fleet')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the random numbers for a reproducible game')
+    parser.add_argument('--level', type=int, default=3, choices=(1, 2, 3, 4),
+                        help='difficulty level of the Comp (default 3)')
+    parser.add_argument('--connect', metavar='HOST:PORT', help='play against another player on a game server (see bsnet)')
+    args = parser.parse_args()
+    if not Board.GRID_SIZE <= args.grid <= Board.MAX_GRID_SIZE:
+        parser.error(f'--grid must be between {Board.GRID_SIZE} and {Board.MAX_GRID_SIZE}')
+    Effects.SEQUENCE.fast = args.fast
+    gb.Profiler.enable(args.profile)
+    if args.connect:
+        online(args.connect)
+    else:
+        main(args.grid, args.seed, args.level)
+    if args.profile:
+        print(gb.Profiler.report())
@@ -0,0 +1,597 @@
+"""
+Two-player games over the network.
+A GameServer owns the boards and resolves every shot and Special with the rules in bsmain.
+Clients send intents (fire at a cell, or activate a ship's Special at a cell) and receive one small
+delta per move: the shot results that changed, as sparse or packed bitboard diffs, and the ships
+they are allowed to see (their own ships moved by countermeasures, and enemy ships once sunk).
+Enemy ship positions never leave the server: the hits countermeasures marks again on a moved ship
+are sent only to its owner, until the opponent fires at them or sinks the ship.
+
+Every message is prefixed with its length (4 bytes). Boards in server messages are relative to
+the receiver: OWN is the board holding the receiver's fleet, ENEMY is the board it fires at.
+    HELLO    version                                        client -> server
+    FIRE     cell
+    SKILL    ship, cell
+    WELCOME  side, grid size, ship records of the receiver's fleet      server -> client
+    DELTA    turn, side to move, ready Specials of the receiver's fleet (bit per ship),
+             bitboard diffs, ship records, ENEMY cell detected by the receiver's Sonar Blast (NO_CELL if none)
+    REJECT   reason
+    END      winning side (NO_WINNER if none)
+Ships are numbered in fleet order (bsmain.FLEET, repeated for large boards).
+Usage:
+    python bsnet.py serve --port 5050
+    python bsmain.py --connect localhost:5050
+    python bsnet.py bots --games 10     (a server and two bot clients over localhost)
+"""
+import argparse
+import asyncio
+import logging as lg
+import queue
+import random as rd
+import statistics
+import struct
+import threading
+import time
+from collections import namedtuple
+import bsheadless as hl
+import bsmain as bs
+import gamerbase as gb
+from bsstate import BoardState, bits
+from gamerbase import SkillType as SkType
+
+VERSION = 2
+PORT = 5050
+LENGTH = struct.Struct('<I')
+MAX_CLIENT_MESSAGE = 1024  # bytes. Client messages are a few bytes; longer ones are not buffered.
+SHIP = struct.Struct('<BHH')  # board << 1 | vertical, ship, first cell
+
+HELLO, FIRE, SKILL = 1, 2, 3
+WELCOME, DELTA, REJECT, END = 16, 17, 18, 19
+
+OWN, ENEMY = 0, 1
+HITS, MISSES, SUNK = range(3)
+MASKS = ('hits', 'misses', 'sunk')  # BoardState bitboards by id.
+SPARSE, PACKED = 0, 1  # Encodings of a bitboard diff: list of cells, or the bytes of the mask.
+
+NOT_YOUR_TURN, CHECKED, NOT_READY, INVALID, GAME_OVER, BUSY = range(1, 7)
+REASONS = {NOT_YOUR_TURN: 'Not your turn.',
+           CHECKED: 'Target already checked.',
+           NOT_READY: 'Special not ready.',
+           INVALID: 'Invalid move.',
+           GAME_OVER: 'The game is over.',
+           BUSY: 'The server is hosting a game. Try again later.'
+           }
+NO_WINNER = 0xFF
+NO_CELL = 0xFFFF
+
+Hello = namedtuple('Hello', 'version')
+Fire = namedtuple('Fire', 'cell')
+Skill = namedtuple('Skill', 'ship cell')
+Welcome = namedtuple('Welcome', 'side grid_size ships')
+Delta = namedtuple('Delta', 'turn side ready masks ships detected')
+Reject = namedtuple('Reject', 'reason')
+End = namedtuple('End', 'winner')
+Closed = namedtuple('Closed', 'error')  # Put in a Client's inbox when the connection ends.
+Ship = namedtuple('Ship', 'board ship cell vertical')
+
+
+# ========== MESSAGES ==========
+
+def frame(payload: bytes) -> bytes:
+    return LENGTH.pack(len(payload)) + payload
+
+
+def pack_hello() -> bytes:
+    return frame(struct.pack('<BB', HELLO, VERSION))
+
+
+def pack_fire(cell: int) -> bytes:
+    return frame(struct.pack('<BH', FIRE, cell))
+
+
+def pack_skill(ship: int, cell: int) -> bytes:
+    return frame(struct.pack('<BHH', SKILL, ship, cell))
+
+
+def pack_welcome(side: int, grid_size: int, ships: list[Ship]) -> bytes:
+    return frame(struct.pack('<BBHH', WELCOME, side, grid_size, len(ships)) + pack_ships(ships))
+
+
+def pack_delta(turn: int, side: int, ready: int, masks: dict[tuple[int, int], int], ships: list[Ship],
+               detected=NO_CELL) -> bytes:
+    """masks: {(board, mask id): diff}, where diff is the XOR of the bitboard before and after the move."""
+    ready_bytes = ready.to_bytes((ready.bit_length() + 7) // 8, 'little')
+    parts = [struct.pack('<BHBH', DELTA, turn, side, len(ready_bytes)), ready_bytes, bytes([len(masks)])]
+    for (board, mask), diff in masks.items():
+        parts.append(pack_diff(board << 2 | mask, diff))
+    parts.append(struct.pack('<H', len(ships)))
+    parts.append(pack_ships(ships))
+    parts.append(struct.pack('<H', detected))
+    return frame(b''.join(parts))
+
+
+def pack_reject(reason: int) -> bytes:
+    return frame(struct.pack('<BB', REJECT, reason))
+
+
+def pack_end(winner: int = None) -> bytes:
+    return frame(struct.pack('<BB', END, NO_WINNER if winner is None else winner))
+
+
+def pack_diff(head: int, diff: int) -> bytes:
+    """Encodes a bitboard diff as a list of cells or as the mask's bytes, whichever is shorter."""
+    packed = diff.to_bytes((diff.bit_length() + 7) // 8, 'little')
+    count = diff.bit_count()
+    if 2 * count <= len(packed):
+        return struct.pack(f'<BBH{count}H', head, SPARSE, count, *bits(diff))
+    return struct.pack('<BBH', head, PACKED, len(packed)) + packed
+
+
+def pack_ships(ships: list[Ship]) -> bytes:
+    return b''.join(SHIP.pack(ship.board << 1 | ship.vertical, ship.ship, ship.cell) for ship in ships)
+
+
+def unpack_ships(payload: bytes, offset: int, count: int) -> list[Ship]:
+    ships = []
+    for n in range(count):
+        head, ship, cell = SHIP.unpack_from(payload, offset + n * SHIP.size)
+        ships.append(Ship(head >> 1, ship, cell, head & 1))
+    return ships
+
+
+def decode(payload: bytes):
+    """Returns the message in a payload as one of the namedtuples above. Raises ValueError if it is malformed."""
+    try:
+        kind = payload[0]
+        if kind == HELLO:
+            return Hello(payload[1])
+        if kind == FIRE:
+            return Fire(*struct.unpack_from('<H', payload, 1))
+        if kind == SKILL:
+            return Skill(*struct.unpack_from('<HH', payload, 1))
+        if kind == WELCOME:
+            side, grid_size, count = struct.unpack_from('<BHH', payload, 1)
+            return Welcome(side, grid_size, unpack_ships(payload, 6, count))
+        if kind == DELTA:
+            turn, side, size = struct.unpack_from('<HBH', payload, 1)
+            offset = 6
+            ready = int.from_bytes(payload[offset:offset + size], 'little')
+            offset += size
+            masks = {}
+            count = payload[offset]
+            offset += 1
+            for _ in range(count):
+                head, encoding, length = struct.unpack_from('<BBH', payload, offset)
+                offset += 4
+                if encoding == SPARSE:
+                    diff = sum(1 << cell for cell in struct.unpack_from(f'<{length}H', payload, offset))
+                    offset += 2 * length
+                else:
+                    diff = int.from_bytes(payload[offset:offset + length], 'little')
+                    offset += length
+                masks[head >> 2, head & 3] = diff
+            count, = struct.unpack_from('<H', payload, offset)
+            ships = unpack_ships(payload, offset + 2, count)
+            detected, = struct.unpack_from('<H', payload, offset + 2 + count * SHIP.size)
+            return Delta(turn, side, ready, masks, ships, detected)
+        if kind == REJECT:
+            return Reject(payload[1])
+        if kind == END:
+            return End(payload[1])
+    except (struct.error, IndexError) as error:
+        raise ValueError(f'Malformed message of {len(payload)} bytes. ({error})') from error
+    raise ValueError(f'Unknown message type {kind}.')
+
+
+async def read_message(reader: asyncio.StreamReader, max_size: int = None) -> tuple[object, int]:
+    """
+    Returns the next message and its size in bytes.
+    Raises ValueError if it is malformed, and OverflowError if it is longer than max_size bytes.
+    The stream cannot be read further after an OverflowError.
+    """
+    size, = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    if max_size is not None and size > max_size:
+        raise OverflowError(f'Message of {size} bytes exceeds {max_size} bytes.')
+    return decode(await reader.readexactly(size)), size + LENGTH.size
+
+
+def apply(delta: Delta, states: list[BoardState]) -> list[int]:
+    """
+    Applies the bitboard diffs to the receiver's OWN and ENEMY BoardStates.
+    Returns the mask of the cells that changed on each board.
+    """
+    changed = [0, 0]
+    for (board, mask), diff in delta.masks.items():
+        state = states[board]
+        setattr(state, MASKS[mask], getattr(state, MASKS[mask]) ^ diff)
+        changed[board] |= diff
+    return changed
+
+
+# ========== SERVER ==========
+
+class Match:
+    """
+    A game between two remote players, resolved with the rules in bsmain.
+    Moves are validated here, and each side is sent only what it is allowed to see.
+    The process must be configured for headless play first (see bsheadless.configure).
+    """
+    def __init__(self, grid_size=bs.Board.GRID_SIZE, seed: int = None):
+        rng = rd.Random(seed)
+        self.grid_size = grid_size
+        self.skills = gb.SkillScheduler()  # Advanced after both sides have moved, like GameFlow.
+        self.players = [gb.Player(rng), gb.Player(rng)]
+        self.players[0].set_opponent(self.players[1])
+        self.players[1].set_opponent(self.players[0])
+        self.boards: list[bs.Board] = []
+        self.fleets: list[list] = []
+        for player in self.players:
+            board = bs.Board(player)
+            board.init_targets(grid_size=grid_size)
+            board.remark_hits = True  # Shown only to the owner (see hidden).
+            fleet = bs.deploy_fleet(board, player, bs.fleet_copies(grid_size), self.skills)
+            bs.place_random(board, fleet)
+            self.boards.append(board)
+            self.fleets.append(fleet)
+        self.turn = 1
+        self.side = 0  # Side to move
+        self.winner = None
+        # Per board, the hits re-marked on ships moved by countermeasures, unknown to the opponent
+        # until fired at or sunk.
+        self.hidden = [0, 0]
+        # Per side, the enemy cell detected by its Sonar Blast during the move.
+        self.detected = [NO_CELL, NO_CELL]
+
+    def welcome(self, side: int) -> bytes:
+        return pack_welcome(side, self.grid_size, self.ships(side))
+
+    def ships(self, side: int, board=OWN) -> list[Ship]:
+        return [Ship(board, n, ship.position[0].index, int(ship.align is bs.vs.Align.VERTICAL))
+                for n, ship in enumerate(self.fleets[side])]
+
+    def ready(self, side: int) -> int:
+        """Returns a mask with a bit set for every ship whose Special can be activated."""
+        return self.players[side].status.ready
+
+    @staticmethod
+    def can_activate(ship) -> bool:
+        special = ship.special
+        return special.ready and special.type is SkType.INSTANT and not ship.sunk
+
+    def masks(self, owner: int, board=OWN) -> tuple[int, ...]:
+        """Returns the bitboards of the owner's board, as seen by the owner (OWN) or the opponent (ENEMY)."""
+        state = self.boards[owner].state
+        masks = [getattr(state, name) for name in MASKS]
+        if board == ENEMY:
+            masks[HITS] &= ~self.hidden[owner]
+        return tuple(masks)
+
+    def snapshot(self) -> tuple:
+        """State compared against after a move to build the deltas."""
+        return ([(self.masks(owner), self.masks(owner, ENEMY)) for owner in (0, 1)],
+                [self.ships(side) for side in (0, 1)],
+                [player.status.sunk for player in self.players])
+
+    def delta(self, side: int, before: tuple) -> bytes:
+        """Returns the delta from the snapshot to the current state, as seen by the side."""
+        masks_before, ships_before, sunk_before = before
+        masks = {}
+        for board, owner in ((OWN, side), (ENEMY, 1 - side)):
+            for mask, (now, was) in enumerate(zip(self.masks(owner, board), masks_before[owner][board])):
+                if now ^ was:
+                    masks[board, mask] = now ^ was
+        # Own ships that moved, and enemy ships sunk by the move.
+        ships = [ship for ship, was in zip(self.ships(side), ships_before[side]) if ship != was]
+        sunk = self.players[1 - side].status.sunk & ~sunk_before[1 - side]
+        if sunk:
+            enemy_ships = self.ships(1 - side, ENEMY)
+            ships += [enemy_ships[n] for n in bits(sunk)]
+        return pack_delta(self.turn, self.side, self.ready(side), masks, ships, self.detected[side])
+
+    def move(self, side: int, intent) -> dict[int, bytes]:
+        """
+        Resolves a player's intent.
+        Returns the messages for each side: a delta for both players, or a rejection for the sender only.
+        """
+        if self.winner is not None:
+            return {side: pack_reject(GAME_OVER)}
+        if side != self.side:
+            return {side: pack_reject(NOT_YOUR_TURN)}
+        enemy = self.boards[1 - side]
+        if not 0 <= getattr(intent, 'cell', -1) < enemy.state.cells:
+            return {side: pack_reject(INVALID)}
+
+        before = self.snapshot()
+        target = enemy.targets[intent.cell]
+        if isinstance(intent, Fire):
+            if self.hidden[1 - side] >> intent.cell & 1:
+                self.hidden[1 - side] &= ~(1 << intent.cell)  # The shot finds the hit already marked there.
+            elif not bs.fire(enemy, target=target):
+                return {side: pack_reject(CHECKED)}
+        elif isinstance(intent, Skill):
+            fleet = self.fleets[side]
+            if not 0 <= intent.ship < len(fleet):
+                return {side: pack_reject(INVALID)}
+            ship = fleet[intent.ship]
+            if not self.can_activate(ship):
+                return {side: pack_reject(NOT_READY)}
+            ship.special(ship.special, enemy, target)
+        else:
+            return {side: pack_reject(INVALID)}
+
+        self.hide_remarked()
+        self.collect_detected()
+        if self.players[1 - side].status.defeated:
+            self.winner = side
+        if side == 1:
+            self.turn += 1
+            self.skills.advance(self.turn)
+        self.side = 1 - side
+        deltas = {s: self.delta(s, before) for s in (0, 1)}
+        self.detected = [NO_CELL, NO_CELL]
+        return deltas
+
+    def hide_remarked(self):
+        """Hides the hits re-marked by countermeasures during the move, and reveals those on sunk ships."""
+        for owner, board in enumerate(self.boards):
+            self.hidden[owner] |= board.remarked
+            self.hidden[owner] &= board.state.hits & ~board.state.sunk
+            board.remarked = 0
+
+    def collect_detected(self):
+        """Takes the cells detected by Sonar Blast, which marks them on the board of the detected ship."""
+        for owner, board in enumerate(self.boards):
+            if board.DETECTED is not None:
+                self.detected[1 - owner] = board.DETECTED.index
+                board.DETECTED = None
+
+    def close(self):
+        bs.clear_boards(self.boards)
+        for player in self.players:
+            gb.Player.remove_player(player)
+
+
+class GameServer:
+    """
+    Seats the first two clients to connect in a Match, and the next two once it ends.
+    One Match is hosted at a time. Skill cooldowns are kept per Match, but the rules in bsmain also update
+    the ship images and messages shared in bsgui.DisplayData, and a Match clears them when it ends.
+    """
+    def __init__(self, grid_size=bs.Board.GRID_SIZE, seed: int = None, max_games=0):
+        self.grid_size = grid_size
+        self.seed = seed
+        self.max_games = max_games  # Stop serving after this many games (0 to keep serving).
+        self.match: Match = None
+        self.games = 0
+        self._table: list[asyncio.StreamWriter] = []
+        self._done: asyncio.Event = None
+
+    async def serve(self, host='localhost', port=PORT, started: asyncio.Future = None):
+        self._done = asyncio.Event()
+        server = await asyncio.start_server(self.connect, host, port)
+        lg.info(f'Serving on {", ".join(str(sock.getsockname()) for sock in server.sockets)}')
+        if started is not None:
+            started.set_result(server.sockets[0].getsockname()[1])
+        async with server:
+            await self._done.wait()
+
+    async def connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            hello, _ = await read_message(reader, MAX_CLIENT_MESSAGE)
+        except (ValueError, OverflowError):
+            hello = None
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        table = self._table
+        if not isinstance(hello, Hello) or hello.version != VERSION or len(table) == 2:
+            writer.write(pack_reject(BUSY if len(table) == 2 else INVALID))
+            writer.close()
+            return
+
+        side = len(table)
+        table.append(writer)
+        if len(table) == 2:
+            self.start()
+        try:
+            while True:
+                try:
+                    intent, _ = await read_message(reader, MAX_CLIENT_MESSAGE)
+                except ValueError:  # The message was read whole, so the next one can still be read.
+                    writer.write(pack_reject(INVALID))
+                    continue
+                if table is not self._table or self.match is None:
+                    writer.write(pack_reject(GAME_OVER if table is not self._table else NOT_YOUR_TURN))
+                    continue
+                for s, message in self.match.move(side, intent).items():
+                    table[s].write(message)
+                if self.match.winner is not None:
+                    self.finish(self.match.winner)
+        except OverflowError:
+            writer.write(pack_reject(INVALID))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if table is self._table:  # Left during the game, or while waiting for an opponent.
+                self.finish(1 - side if self.match is not None else None)
+            writer.close()
+
+    def start(self):
+        seed = None if self.seed is None else self.seed + self.games
+        self.match = Match(self.grid_size, seed)
+        before = self.match.snapshot()
+        for side, writer in enumerate(self._table):
+            writer.write(self.match.welcome(side))
+            writer.write(self.match.delta(side, before))
+        lg.info(f'Game {self.games + 1} started.')
+
+    def finish(self, winner: int = None):
+        """Ends the game, reporting the winner to both players, and frees the table for the next two."""
+        table, match = self._table, self.match
+        self._table, self.match = [], None
+        for writer in table:
+            writer.write(pack_end(winner))
+            writer.close()
+        if match is not None:
+            match.close()
+            self.games += 1
+            lg.info(f'Game {self.games} ended. Winner: {winner}')
+            if self.max_games and self.games >= self.max_games:
+                self._done.set()
+
+
+# ========== CLIENTS ==========
+
+class Client:
+    """
+    Connection to a GameServer, run on a background thread so the render loop never waits on the network.
+    Intents are sent with fire() and skill(). Received messages are collected with poll().
+    """
+    def __init__(self, host='localhost', port=PORT):
+        self.host = host
+        self.port = port
+        self._inbox = queue.SimpleQueue()
+        self._writer: asyncio.StreamWriter = None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._thread = threading.Thread(target=asyncio.run, args=(self._session(),), daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    async def _session(self):
+        try:
+            reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as error:
+            self._inbox.put(Closed(str(error)))
+            return
+        self._loop = asyncio.get_running_loop()
+        self._writer.write(pack_hello())
+        error = ''
+        try:
+            while True:
+                message, _ = await read_message(reader)
+                self._inbox.put(message)
+        except asyncio.IncompleteReadError:
+            pass
+        except (ConnectionError, ValueError) as exc:
+            error = str(exc)
+        finally:
+            self._writer.close()
+        self._inbox.put(Closed(error))
+
+    def send(self, data: bytes):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._writer.write, data)
+
+    def fire(self, cell: int):
+        self.send(pack_fire(cell))
+
+    def skill(self, ship: int, cell: int):
+        self.send(pack_skill(ship, cell))
+
+    def poll(self) -> list:
+        """Returns the messages received since the last poll, without waiting."""
+        messages = []
+        while not self._inbox.empty():
+            messages.append(self._inbox.get_nowait())
+        return messages
+
+    def close(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._writer.close)
+
+
+async def bot(host='localhost', port=PORT, seed: int = None, skill_chance=0.5) -> dict:
+    """
+    Plays one game through a server, firing at random unchecked cells of its copy of the enemy board,
+    and activating ready Specials with 'skill_chance'.
+    Returns whether it won, the number of moves, the bytes of every delta received, and the time
+    from sending each move to receiving its delta.
+    """
+    rng = rd.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(pack_hello())
+    states, side, winner = None, None, None
+    sizes, latencies, sent = [], [], None
+    try:
+        while True:
+            message, size = await read_message(reader)
+            if isinstance(message, Welcome):
+                side = message.side
+                states = [BoardState(message.grid_size), BoardState(message.grid_size)]
+            elif isinstance(message, Delta):
+                apply(message, states)
+                sizes.append(size)
+                if sent is not None:
+                    latencies.append(time.perf_counter() - sent)
+                    sent = None
+                if message.side == side:
+                    cell = rng.choice(states[ENEMY].unchecked())
+                    ready = list(bits(message.ready))
+                    if ready and rng.random() < skill_chance:
+                        writer.write(pack_skill(rng.choice(ready), cell))
+                    else:
+                        writer.write(pack_fire(cell))
+                    sent = time.perf_counter()
+            elif isinstance(message, Reject):
+                raise RuntimeError(REASONS[message.reason])
+            elif isinstance(message, End):
+                winner = None if message.winner == NO_WINNER else message.winner
+                break
+    finally:
+        writer.close()
+    return {'won': winner == side, 'moves': len(latencies), 'sizes': sizes, 'latencies': latencies}
+
+
+async def bot_games(games=1, grid_size=bs.Board.GRID_SIZE, seed: int = None) -> list[tuple[dict, dict]]:
+    """Serves 'games' games on a free localhost port between pairs of bots. Returns the results of both bots."""
+    server = GameServer(grid_size, seed, max_games=games)
+    started = asyncio.get_running_loop().create_future()
+    serving = asyncio.create_task(server.serve('localhost', 0, started))
+    port = await started
+    results = []
+    for n in range(games):
+        bot_seed = None if seed is None else seed + n
+        first = asyncio.create_task(bot('localhost', port, bot_seed))
+        await asyncio.sleep(0)  # Connect in order, so the first bot takes side 0.
+        second = asyncio.create_task(bot('localhost', port, None if bot_seed is None else bot_seed + 1))
+        results.append(tuple(await asyncio.gather(first, second)))
+    await serving
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Network game server for Project BattleShip.')
+    parser.add_argument('mode', choices=('serve', 'bots'),
+                        help="'serve' hosts games; 'bots' plays games between bots on a local server")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('-p', '--port', type=int, default=PORT)
+    parser.add_argument('-g', '--grid', type=int, default=bs.Board.GRID_SIZE, metavar='N', help='board size')
+    parser.add_argument('-s', '--seed', type=int, default=None, help='seed of the first game (seed + n for game n)')
+    parser.add_argument('-n', '--games', type=int, default=1, help='games to play in bots mode')
+    args = parser.parse_args()
+    if not bs.Board.GRID_SIZE <= args.grid <= bs.Board.MAX_GRID_SIZE:
+        parser.error(f'--grid must be between {bs.Board.GRID_SIZE} and {bs.Board.MAX_GRID_SIZE}')
+
+    hl.configure()  # Moves are resolved without a window, sound or effect delays.
+    if args.mode == 'serve':
+        asyncio.run(GameServer(args.grid, args.seed).serve(args.host, args.port))
+        return
+
+    lg.getLogger().setLevel(lg.WARNING)
+    start = time.perf_counter()
+    results = asyncio.run(bot_games(args.games, args.grid, args.seed))
+    elapsed = time.perf_counter() - start
+    sizes = [size for pair in results for result in pair for size in result['sizes']]
+    latencies = sorted(latency for pair in results for result in pair for latency in result['latencies'])
+    moves = sum(result['moves'] for pair in results for result in pair)
+    print(f'{args.games} game(s), {moves} move(s) in {elapsed:.2f} second(s)')
+    print(f'Side 0 won {sum(pair[0]["won"] for pair in results)}, side 1 won {sum(pair[1]["won"] for pair in results)}')
+    print(f'Delta size: mean {statistics.mean(sizes):.1f} bytes, max {max(sizes)} bytes')
+    print(f'Move latency: median {statistics.median(latencies) * 1e3:.2f} ms, '
+          f'p95 {latencies[int(len(latencies) * 0.95)] * 1e3:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Compact binary replay log.
+A game is a header followed by fixed-width event records, ending with an END record.
+Games can be appended one after another to a single file and read back as a stream.
+
+Header (21 bytes): magic, version, grid size, RNG seed (signed), difficulty levels of both players,
+    turn limit of the game.
+Record (5 bytes): kind (3 bits) | board (1 bit) | flags (4 bits), cell, ship.
+    PLACE     initial placement. cell = first cell, flags = vertical | length << 1
+    SHOT      cell fired at. flags = MISS, HIT or SINK (every cell of a sunk ship is marked hit)
+    SKILL     special activated by the ship. cell = target cell (NO_CELL if none),
+              flags = 1 if the ship belongs to the board's player
+    RELOCATE  ship moved by countermeasures. cell = new first cell, flags = vertical | REMARKED << 1.
+              The misses on the board are cleared.
+    END       cell = turns, ship = board of the winning player (NO_WINNER if none)
+Ships are numbered in fleet order per board.
+Usage: python bsreplay.py games.bsr [--verify]
+"""
+import argparse
+import io
+import logging as lg
+import struct
+from collections import namedtuple
+from bsstate import BoardState, bits
+
+MAGIC = b'BSRP'
+VERSION = 2
+HEADER = struct.Struct('<4sBHqBBI')
+RECORD = struct.Struct('<BHH')
+
+PLACE, SHOT, SKILL, RELOCATE, END = range(5)
+MISS, HIT, SINK = range(3)
+REMARKED = 1  # Hits on a relocated ship are marked again at its new position.
+NO_CELL = NO_WINNER = 0xFFFF
+SEEDS = range(-2 ** 63, 2 ** 63)  # Seeds that fit in the header.
+MAX_TURNS = 0xFFFE  # Largest turn limit that fits in the END record, which holds the turn after the last.
+
+Header = namedtuple('Header', 'grid_size seed levels max_turns')
+Event = namedtuple('Event', 'kind board flags cell ship')
+
+
+class Recorder:
+    """
+    Writes the events of one game at a time to a binary file.
+    Boards report their events while their 'recorder' attribute is set (see bsmain).
+    """
+    def __init__(self, file):
+        self.file = file
+        self._sides = {}
+        self._ships = {}
+
+    def start(self, boards, seed=0, levels=(0, 0), max_turns=0):
+        """Writes the header and the fleet placements, then records the events of both boards."""
+        if max_turns > MAX_TURNS:
+            raise ValueError(f'Games of more than {MAX_TURNS} turns cannot be recorded.')
+        self.file.write(HEADER.pack(MAGIC, VERSION, boards[0].GRID_SIZE, seed, *levels, max_turns))
+        self._sides = {board: side for side, board in enumerate(boards)}
+        self._ships = {}
+        for side, board in enumerate(boards):
+            board.recorder = self
+            for index, ship in enumerate(board.player.fleet.values()):
+                self._ships[ship] = index
+                self._write(PLACE, side, self._vertical(ship) | ship.size << 1, ship.position[0].index, index)
+
+    def shot(self, board, target, result: int):
+        self._write(SHOT, self._sides[board], result, target.index)
+
+    def skill(self, board, ship, target=None):
+        own = ship.player is board.player
+        self._write(SKILL, self._sides[board], int(own), target.index if target else NO_CELL, self._ships[ship])
+
+    def relocate(self, board, ship, remarked=False):
+        flags = self._vertical(ship) | int(remarked) << 1
+        self._write(RELOCATE, self._sides[board], flags, ship.position[0].index, self._ships[ship])
+
+    def end(self, winner=None, turns=0):
+        self._write(END, 0, 0, turns, NO_WINNER if winner is None else winner)
+        for board in self._sides:
+            board.recorder = None
+        self._sides = {}
+
+    def _write(self, kind: int, side: int, flags: int, cell: int, ship=0):
+        self.file.write(RECORD.pack(kind << 5 | side << 4 | flags, cell, ship))
+
+    @staticmethod
+    def _vertical(ship) -> int:
+        return int(ship.position[0].x == ship.position[-1].x)
+
+
+def read(file):
+    """Yields the Header and Events of every game in the file, in order."""
+    while True:
+        data = file.read(HEADER.size)
+        if not data:
+            return
+        magic, version, grid_size, seed, level1, level2, max_turns = HEADER.unpack(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'Not a version {VERSION} replay log.')
+        yield Header(grid_size, seed, (level1, level2), max_turns)
+
+        while True:
+            data = file.read(RECORD.size)
+            if len(data) < RECORD.size:
+                raise ValueError('Replay log ends in the middle of a game.')
+            head, cell, ship = RECORD.unpack(data)
+            event = Event(head >> 5, head >> 4 & 1, head & 0xF, cell, ship)
+            yield event
+            if event.kind == END:
+                break
+
+
+def games(file):
+    """Yields (Header, [Event, ...]) for every game in the file."""
+    header, events = None, []
+    for record in read(file):
+        if isinstance(record, Header):
+            header, events = record, []
+        else:
+            events.append(record)
+            if record.kind == END:
+                yield header, events
+
+
+class Replay:
+    """
+    Applies the events of a game directly to a BoardState per board,
+    without Targets, Vessels, skills or rendering.
+    """
+    def __init__(self, header: Header):
+        self.header = header
+        self.states = [BoardState(header.grid_size), BoardState(header.grid_size)]
+        # Per board, per ship: [mask of cells, length, damage]
+        self.ships: list[list[list[int]]] = [[], []]
+        self.shots = [0, 0]  # Shots fired at each board
+        self.skills = [0, 0]  # Skills activated by each board's player
+        self.winner = None
+        self.turns = 0
+
+    def run(self, events):
+        for event in events:
+            self.apply(event)
+        return self
+
+    def apply(self, event: Event):
+        state = self.states[event.board]
+        if event.kind == PLACE:
+            self.ships[event.board].append([0, event.flags >> 1, 0])
+            self._place(event.board, event.ship, event.cell, event.flags & 1)
+
+        elif event.kind == SHOT:
+            self.shots[event.board] += 1
+            if event.flags == MISS:
+                state.mark_miss(event.cell)
+                return
+            ship = state.ships[event.cell]
+            if ship is None:
+                raise ValueError(f'Hit recorded on an empty cell ({event}).')
+            state.mark_hit(event.cell)
+            mask, length, damage = self.ships[event.board][ship]
+            self.ships[event.board][ship][2] = min(length, damage + 1)
+            if event.flags == SINK:
+                # Every cell of a sunk ship shows as hit, including hits from before a relocation.
+                for cell in bits(mask):
+                    state.mark_hit(cell)
+                state.sink(mask, length)
+
+        elif event.kind == SKILL:
+            self.skills[event.board if event.flags else 1 - event.board] += 1
+
+        elif event.kind == RELOCATE:
+            # Mirrors Special.countermeasures.
+            mask, length, damage = self.ships[event.board][event.ship]
+            for cell in bits(mask):
+                state.place(cell, None)
+                state.clear(cell)
+            self._place(event.board, event.ship, event.cell, event.flags & 1)
+            if event.flags >> 1 & REMARKED:
+                for cell in list(bits(self.ships[event.board][event.ship][0]))[:damage]:
+                    state.mark_hit(cell)
+            for cell in bits(state.misses):
+                state.clear(cell)
+
+        elif event.kind == END:
+            self.turns = event.cell
+            self.winner = None if event.ship == NO_WINNER else event.ship
+
+    def _place(self, side: int, ship: int, cell: int, vertical: int):
+        state = self.states[side]
+        length = self.ships[side][ship][1]
+        mask = state.span_mask(cell, length, bool(vertical))
+        for index in bits(mask):
+            state.place(index, ship)
+            state.clear(index)
+        self.ships[side][ship][0] = mask
+
+    def sunk(self, side: int) -> int:
+        """Number of ships sunk on the board."""
+        return sum(not ship[0] & ~self.states[side].sunk for ship in self.ships[side])
+
+
+def record_game(seed: int, levels=(3, 3), grid_size=10, max_turns: int = None) -> bytes:
+    """Plays a seeded headless game and returns its replay log."""
+    import bsheadless as hl
+    buffer = io.BytesIO()
+    max_turns = hl.MAX_TURNS if max_turns is None else max_turns
+    hl.play_game(levels, max_turns, grid_size, seed, Recorder(buffer))
+    return buffer.getvalue()
+
+
+def verify(header: Header, events: list[Event]) -> bool:
+    """Re-simulates the game from its seed and checks that it produces the same events."""
+    data = record_game(header.seed, header.levels, header.grid_size, header.max_turns)
+    _, replayed = next(games(io.BytesIO(data)))
+    return replayed == events
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay games from a binary replay log.')
+    parser.add_argument('path')
+    parser.add_argument('--verify', action='store_true', help='re-simulate every game from its seed and compare')
+    args = parser.parse_args()
+
+    # Applies to the game modules imported later for verifying, which configure logging on import.
+    lg.disable(lg.INFO)
+    if args.verify:
+        import bsheadless as hl
+        hl.configure()
+    with open(args.path, 'rb') as file:
+        for number, (header, events) in enumerate(games(file)):
+            replay = Replay(header).run(events)
+            line = (f'Game {number + 1}: {header.grid_size}x{header.grid_size}, seed {header.seed}, '
+                    f'levels {header.levels}, winner {replay.winner}, turns {replay.turns}, '
+                    f'shots {replay.shots}, sunk {replay.sunk(0)}/{replay.sunk(1)}')
+            if args.verify:
+                line += ', verified' if verify(header, events) else ', MISMATCH'
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
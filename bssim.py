@@ -0,0 +1,138 @@
+"""
+Batch Monte Carlo simulation of headless Comp-vs-Comp games across CPU cores.
+Used to balance Special.SKILLS chance and cooldown values empirically.
+Usage: python bssim.py --games 1000 --levels 1 2 3 4 --opponent 3
+"""
+import argparse
+import io
+import json
+import logging as lg
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+import bsheadless as hl
+import bsreplay as rp
+
+BATCH_SIZE = 50
+
+
+def _init_worker():
+    hl.configure()
+    lg.getLogger().setLevel(lg.WARNING)
+
+
+def run_batch(level: int, opponent: int, seeds: list[int], record=False) -> tuple[list[dict], bytes]:
+    """
+    Plays one game per seed between the level and its opponent, alternating who moves first.
+    Returns the results from the perspective of the level under test, and the replay log of the games if recorded.
+    """
+    records = []
+    log = io.BytesIO()
+    recorder = rp.Recorder(log) if record else None
+    for seed in seeds:
+        first = seed % 2 == 0
+        result = hl.play_game((level, opponent) if first else (opponent, level), seed=seed, recorder=recorder)
+        side = 0 if first else 1
+        records.append({'won': result['winner'] == side,
+                        'draw': result['winner'] is None,
+                        'turns': result['turns'],
+                        'shots': result['shots'][side],
+                        'sinks': result['sinks'][side],
+                        'skills': result['skills'][side]
+                        })
+    return records, log.getvalue()
+
+
+def summarize(records: list[dict]) -> dict:
+    """Aggregates the records of one level into win rate, turns to win, shots per sink and skill rates."""
+    games = len(records)
+    wins = [record for record in records if record['won']]
+    shots = sum(record['shots'] for record in records)
+    sinks = sum(record['sinks'] for record in records)
+
+    skills = {}
+    for record in records:
+        for name, (attempts, activations) in record['skills'].items():
+            totals = skills.setdefault(name, [0, 0])
+            totals[0] += attempts
+            totals[1] += activations
+
+    return {'games': games,
+            'wins': len(wins),
+            'draws': sum(record['draw'] for record in records),
+            'win_rate': len(wins) / games if games else 0.0,
+            'turns_to_win': statistics.mean(record['turns'] for record in wins) if wins else None,
+            'shots_per_sink': shots / sinks if sinks else None,
+            'skills': {name: {'attempts': attempts,
+                              'activations': activations,
+                              'success_rate': activations / attempts if attempts else None,
+                              'per_game': activations / games if games else 0.0}
+                       for name, (attempts, activations) in sorted(skills.items())}
+            }
+
+
+def simulate(games=100, levels=(1, 2, 3, 4), opponent=3, workers=None, seed=0, record: str = None) -> dict:
+    """
+    Plays 'games' independent games for every difficulty level against the opponent level,
+    spread over a process pool. Each game is seeded from 'seed', so results are reproducible.
+    If 'record' is a path, every game is appended to that replay log (see bsreplay).
+    Returns {level: summary}.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {}
+        for level in levels:
+            seeds = [seed + n for n in range(games)]
+            futures[level] = [executor.submit(run_batch, level, opponent, seeds[n:n + BATCH_SIZE], bool(record))
+                              for n in range(0, games, BATCH_SIZE)]
+
+        results = {}
+        log = open(record, 'ab') if record else None
+        for level, batches in futures.items():
+            records = []
+            for future in batches:
+                batch, replays = future.result()
+                records.extend(batch)
+                if log is not None:
+                    log.write(replays)
+            results[level] = summarize(records)
+        if log is not None:
+            log.close()
+        return results
+
+
+def print_report(results: dict, opponent: int):
+    for level, summary in results.items():
+        turns = summary['turns_to_win']
+        shots = summary['shots_per_sink']
+        print(f"Level {level} vs level {opponent}: {summary['wins']}/{summary['games']} won "
+              f"({summary['win_rate']:.1%}), {summary['draws']} draw(s), "
+              f"turns to win: {f'{turns:.1f}' if turns else '-'}, "
+              f"shots per sink: {f'{shots:.2f}' if shots else '-'}")
+        for name, skill in summary['skills'].items():
+            rate = skill['success_rate']
+            print(f"    {name:<16} {skill['activations']:>6} activation(s), "
+                  f"success {f'{rate:.1%}' if rate is not None else '-':>6}, "
+                  f"{skill['per_game']:.2f} per game")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate Comp-vs-Comp games across CPU cores.')
+    parser.add_argument('-n', '--games', type=int, default=100, help='games per difficulty level')
+    parser.add_argument('-l', '--levels', type=int, nargs='+', default=(1, 2, 3, 4))
+    parser.add_argument('-o', '--opponent', type=int, default=3, help='difficulty level of the opponent')
+    parser.add_argument('-w', '--workers', type=int, default=None)
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help='also write the results to a JSON file')
+    parser.add_argument('--record', metavar='PATH', help='append every game to a replay log (see bsreplay)')
+    args = parser.parse_args()
+    if args.record and not (args.seed in rp.SEEDS and args.seed + args.games - 1 in rp.SEEDS):
+        parser.error('--seed must fit in 64 bits to record the games')
+
+    results = simulate(args.games, args.levels, args.opponent, args.workers, args.seed, args.record)
+    print_report(results, args.opponent)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
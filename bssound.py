@@ -0,0 +1,111 @@
+"""
+Sound bank for the game effects.
+Sounds are referenced by name, loaded from disk on first use and cached afterwards.
+Each category of effect plays on its own reserved mixer channels, so a burst of skill shots
+cannot cut off the hit and sink sounds. Without an audio device, or when disabled for headless
+games, a silent backend stands in for the mixer.
+"""
+import os
+import logging as lg
+import pygame as pg
+
+
+class NullSound:
+    """Silent stand-in for pg.mixer.Sound."""
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        return None
+
+    def get_length(self) -> float:
+        return 0.0
+
+
+class SoundBank:
+    FOLDER = 'Sounds'
+    FILES = {'launch': 'missile.wav',
+             'hit': 'hit2.wav',
+             'sink': 'explosion.mp3',
+             'salvo': 'rapid-missile-launch.wav',
+             'sonar': 'sonar2.wav',
+             'dive': 'submarine-travel.mp3',
+             'depth_charge': 'depth.wav',
+             'railgun': 'railgun.mp3',
+             'defeat': 'dies-irae.wav',
+             'victory': 'victory-fanfare.wav'
+             }
+    # Sounds of a category share its reserved channels. Names not listed play as 'impact'.
+    CATEGORIES = {'launch': 'launch',
+                  'salvo': 'skill', 'sonar': 'skill', 'dive': 'skill', 'depth_charge': 'skill', 'railgun': 'skill',
+                  'defeat': 'music', 'victory': 'music'
+                  }
+    CHANNELS = {'launch': 2, 'impact': 3, 'skill': 2, 'music': 1}
+
+    ENABLED = True
+    LOADED: dict[str, pg.mixer.Sound] = {}
+    _channels: dict[str, list[pg.mixer.Channel]] = None  # None until the mixer is initialized.
+
+    @classmethod
+    def init(cls) -> bool:
+        """Initializes the mixer and reserves the channels. Falls back to silence without an audio device."""
+        if cls._channels is not None:
+            return cls.ENABLED
+        cls._channels = {}
+        if not cls.ENABLED:
+            return False
+        try:
+            if not pg.mixer.get_init():
+                pg.mixer.init()
+        except pg.error as error:
+            lg.warning(f'No audio device. Sound disabled. ({error})')
+            cls.ENABLED = False
+            return False
+
+        reserved = sum(cls.CHANNELS.values())
+        pg.mixer.set_num_channels(max(pg.mixer.get_num_channels(), reserved + 4))
+        pg.mixer.set_reserved(reserved)
+        index = 0
+        for category, count in cls.CHANNELS.items():
+            cls._channels[category] = [pg.mixer.Channel(index + n) for n in range(count)]
+            index += count
+        return True
+
+    @classmethod
+    def disable(cls):
+        """Uses the silent backend from now on."""
+        cls.ENABLED = False
+        cls.LOADED.clear()
+        if cls._channels:
+            pg.mixer.quit()
+        cls._channels = {}
+
+    @classmethod
+    def get(cls, name: str):
+        sound = cls.LOADED.get(name)
+        if sound is None:
+            sound = NullSound()
+            if cls.init():
+                try:
+                    sound = pg.mixer.Sound(os.path.join(cls.FOLDER, cls.FILES[name]))
+                except (pg.error, FileNotFoundError) as error:
+                    lg.error(f'Unable to load sound {name!r}. ({error})')
+            cls.LOADED[name] = sound
+        return sound
+
+    @classmethod
+    def preload(cls, *names: str):
+        for name in names or cls.FILES:
+            cls.get(name)
+
+    @classmethod
+    def play(cls, name: str):
+        """Plays the sound on a free channel of its category, or on the one that started playing first."""
+        sound = cls.get(name)
+        if not cls.ENABLED or isinstance(sound, NullSound):  # Disabled, or the file failed to load.
+            return
+        channels = cls._channels[cls.CATEGORIES.get(name, 'impact')]
+        channel = next((channel for channel in channels if not channel.get_busy()), channels[0])
+        channels.remove(channel)
+        channels.append(channel)
+        channel.play(sound)
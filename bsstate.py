@@ -0,0 +1,548 @@
+"""
+Compact board-state engine.
+Occupancy, hits and misses are kept as integer bitboards indexed by cell,
+where cell = y * size + x. Board and Target in bsmain are views over this state.
+"""
+import random as rd
+from functools import lru_cache
+import numpy as np
+
+
+def bits(mask: int):
+    """Iterates over the index of every set bit in mask, lowest first."""
+    if mask.bit_length() > 1024:  # Bit twiddling is quadratic on large boards.
+        return np.flatnonzero(to_array(mask, mask.bit_length())).tolist()
+    return _low_bits(mask)
+
+
+def _low_bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def to_array(mask: int, cells: int) -> np.ndarray:
+    """Unpacks a bitboard into a boolean vector indexed by cell."""
+    packed = np.frombuffer(mask.to_bytes((cells + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(packed, count=cells, bitorder='little').view(bool)
+
+
+class Geometry:
+    """
+    Immutable index tables for a square board, built once per board size.
+    Neighbors are listed in ORDINAL order; 'bounded' neighbors are None beyond the edge
+    of the board, while 'wrapped' neighbors continue on the opposite edge.
+    """
+    ORDINAL = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+    def __init__(self, size: int):
+        self._size = size
+        cells = range(size * size)
+        self.rows = tuple(tuple(range(y * size, (y + 1) * size)) for y in range(size))
+        self.columns = tuple(tuple(range(x, size * size, size)) for x in range(size))
+        self.wrapped = tuple(
+            tuple(((cell // size + dy) % size) * size + (cell % size + dx) % size for dx, dy in self.ORDINAL)
+            for cell in cells)
+        self.bounded = tuple(
+            tuple((cell // size + dy) * size + cell % size + dx
+                  if 0 <= cell % size + dx < size and 0 <= cell // size + dy < size else None
+                  for dx, dy in self.ORDINAL)
+            for cell in cells)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._size}x{self._size})'
+
+    @staticmethod
+    @lru_cache
+    def for_size(size: int):
+        return Geometry(size)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+class PlacementTable:
+    """
+    Every straight placement of a ship length on a board, built once per board size.
+    Placements are held as arrays of the cells they cover, so their legality against
+    any bitboard is a single vectorized lookup.
+    """
+    ATTEMPTS = 16  # Random placements tried before checking all of them.
+
+    def __init__(self, size: int):
+        self._size = size
+        self._cells = {}
+        self._vertical = {}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._size}x{self._size})'
+
+    @staticmethod
+    @lru_cache
+    def for_size(size: int):
+        return PlacementTable(size)
+
+    def cells(self, length: int) -> np.ndarray:
+        """Returns an array of shape (placements, length) of the cells covered by each placement."""
+        if length not in self._cells:
+            size = self._size
+            grid = np.arange(size * size).reshape(size, size)
+            steps = np.arange(length)
+            across = grid[:, :size - length + 1].reshape(-1, 1) + steps
+            down = grid[:size - length + 1, :].reshape(-1, 1) + steps * size
+            if length == 1:
+                down = down[:0]
+            self._cells[length] = np.concatenate((across, down))
+            self._vertical[length] = np.arange(len(across) + len(down)) >= len(across)
+        return self._cells[length]
+
+    def legal(self, length: int, blocked: int) -> np.ndarray:
+        """Returns a boolean array of the placements that do not cover a blocked cell."""
+        cells = self.cells(length)
+        return ~to_array(blocked, self._size * self._size)[cells].any(axis=1)
+
+    def sample(self, length: int, blocked: int, rng: rd.Random = None) -> tuple[int, bool]:
+        """
+        Returns the mask and orientation (vertical=True) of a random legal placement.
+        Returns None if there is no legal placement.
+        """
+        rng = rng if rng is not None else rd
+        cells = self.cells(length)
+        # Sparse boards rarely block a placement, so try a few before scanning every one.
+        for _ in range(self.ATTEMPTS):
+            p = rng.randrange(len(cells))
+            mask = sum(1 << cell for cell in cells[p].tolist())
+            if not mask & blocked:
+                return mask, bool(self._vertical[length][p])
+
+        choices = np.flatnonzero(self.legal(length, blocked))
+        if not len(choices):
+            return None
+        p = int(choices[rng.randrange(len(choices))])
+        return sum(1 << cell for cell in cells[p].tolist()), bool(self._vertical[length][p])
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+class BoardState:
+    """Bitboards and per-cell ship references for one square board."""
+    def __init__(self, size=10):
+        self._size = size
+        self._cells = size * size
+        self.occupied = 0
+        self.hits = 0
+        self.misses = 0
+        self.sunk = 0
+        self.ships = [None] * self._cells
+        self.density: DensityMap = None
+        self.frontier = Frontier(size)
+        self.fleet = ShipIndex()
+        # Bit patterns for a vertical line of n cells starting at cell 0.
+        self._columns = {}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._size}x{self._size})'
+
+    def index(self, x: int, y: int) -> int:
+        return y * self._size + x
+
+    def coord(self, index: int) -> tuple[int, int]:
+        y, x = divmod(index, self._size)
+        return x, y
+
+    def result(self, index: int) -> str:
+        bit = 1 << index
+        if self.hits & bit:
+            return 'HIT'
+        if self.misses & bit:
+            return 'MISS'
+        return ''
+
+    def is_checked(self, index: int) -> bool:
+        return bool((self.hits | self.misses) >> index & 1)
+
+    def is_occupied(self, index: int) -> bool:
+        return bool(self.occupied >> index & 1)
+
+    def mark_hit(self, index: int):
+        bit = 1 << index
+        opened = not (self.hits | self.sunk) & bit
+        if self.occupied & ~self.checked & bit:
+            self.fleet.check(index, self.ships[index])
+        self.hits |= bit
+        if self.misses & bit:
+            self.misses &= ~bit
+            self._unblock(index)
+        self.frontier.check(index)
+        if opened:
+            self.frontier.add(index, self.checked)
+
+    def mark_miss(self, index: int):
+        bit = 1 << index
+        if self.hits & ~self.sunk & bit:
+            self.frontier.remove(index)
+        if self.occupied & ~self.checked & bit:
+            self.fleet.check(index, self.ships[index])
+        self.misses |= bit
+        self.hits &= ~bit
+        self.frontier.check(index)
+        if self.density is not None:
+            self.density.block(index)
+
+    def clear(self, index: int):
+        """Removes any shot result from the cell."""
+        bit = 1 << index
+        if (self.misses | self.sunk) & bit:
+            self._unblock(index)
+        if self.hits & ~self.sunk & bit:
+            self.frontier.remove(index)
+        checked = (self.hits | self.misses) & bit
+        self.hits &= ~bit
+        self.misses &= ~bit
+        self.sunk &= ~bit
+        if checked:
+            self.frontier.uncheck(index)
+            if self.occupied & bit:
+                self.fleet.uncheck(index, self.ships[index])
+
+    def sink(self, mask: int, length: int):
+        """Records the cells of a sunk ship."""
+        for index in bits(mask & self.hits & ~self.sunk):
+            self.frontier.remove(index)
+        self.sunk |= mask
+        if self.density is not None:
+            self.density.sink(mask, length)
+
+    def track_density(self, ship_sizes):
+        """Maintains a DensityMap of the given fleet from now on, unless the board is too large for one."""
+        if self._size > DensityMap.MAX_SIZE:
+            self.density = None
+            return
+        self.density = DensityMap(self._size, ship_sizes)
+        for index in bits(self.misses | self.sunk):
+            self.density.block(index)
+
+    def _unblock(self, index: int):
+        if self.density is not None:
+            self.density.unblock(index)
+
+    def place(self, index: int, ship):
+        self.fleet.place(index, self.ships[index], ship, not self.is_checked(index))
+        self.ships[index] = ship
+        if ship is None:
+            self.occupied &= ~(1 << index)
+        else:
+            self.occupied |= 1 << index
+
+    def span_mask(self, index: int, length: int, vertical=False) -> int:
+        """
+        Returns the mask of a straight line of cells starting at index.
+        Returns 0 if the line would run off the board.
+        """
+        x, y = self.coord(index)
+        if vertical:
+            if y + length > self._size:
+                return 0
+            pattern = self._columns.get(length)
+            if pattern is None:
+                pattern = sum(1 << (n * self._size) for n in range(length))
+                self._columns[length] = pattern
+            return pattern << index
+        if x + length > self._size:
+            return 0
+        return ((1 << length) - 1) << index
+
+    def vacant(self, mask: int) -> bool:
+        return not self.occupied & mask
+
+    def unchecked(self) -> list[int]:
+        return np.flatnonzero(~to_array(self.checked, self._cells)).tolist()
+
+    def clear_results(self):
+        """Removes every shot result and restores the full fleet to the DensityMap."""
+        self.hits = self.misses = self.sunk = 0
+        self.frontier.reset()
+        self.fleet.restore()
+        if self.density is not None:
+            self.density.reset()
+
+    def reset(self):
+        self.occupied = 0
+        self.ships = [None] * self._cells
+        self.fleet.reset()
+        self.clear_results()
+
+    # ----- Read-only Properties -----
+
+    @property
+    def checked(self) -> int:
+        return self.hits | self.misses
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def cells(self) -> int:
+        return self._cells
+
+
+class DensityMap:
+    """
+    Counts, for every cell, the placements of the remaining ships that could still cover it.
+    Placements through a miss or a sunk ship are blocked. Blocking or unblocking a cell only
+    updates the placements through that cell.
+    """
+    MAX_SIZE = 100  # Larger boards hold too many placements to track.
+
+    def __init__(self, size: int, ship_sizes):
+        self._size = size
+        self._ship_sizes = tuple(ship_sizes)
+        self.placements, self.covering, self.spans = self.layout(size, tuple(sorted(set(ship_sizes))))
+        self.reset()
+
+    @staticmethod
+    @lru_cache
+    def layout(size: int, lengths: tuple[int, ...]) -> tuple[tuple, tuple, dict]:
+        """
+        Returns every straight placement of the given lengths on the board as tuples of cells,
+        for each cell the indexes of the placements covering it,
+        and for each length the range of indexes of its placements.
+        """
+        table = PlacementTable.for_size(size)
+        placements, covering, spans = [], [[] for _ in range(size * size)], {}
+        for length in lengths:
+            start = len(placements)
+            for cells in table.cells(length).tolist():
+                for cell in cells:
+                    covering[cell].append(len(placements))
+                placements.append(tuple(cells))
+            spans[length] = range(start, len(placements))
+        return tuple(placements), tuple(tuple(cells) for cells in covering), spans
+
+    def reset(self):
+        self.remaining = {}
+        for length in self._ship_sizes:
+            self.remaining[length] = self.remaining.get(length, 0) + 1
+        self.blocked = 0
+        self._blocks = [0] * len(self.placements)
+        self.weights = [0] * (self._size * self._size)
+        for cells in self.placements:
+            self._adjust(cells, self.remaining[len(cells)])
+
+    def _adjust(self, cells: tuple[int, ...], amount: int):
+        weights = self.weights
+        for cell in cells:
+            weights[cell] += amount
+
+    def block(self, index: int):
+        bit = 1 << index
+        if self.blocked & bit:
+            return
+        self.blocked |= bit
+        for p in self.covering[index]:
+            self._blocks[p] += 1
+            if self._blocks[p] == 1:
+                cells = self.placements[p]
+                self._adjust(cells, -self.remaining[len(cells)])
+
+    def unblock(self, index: int):
+        bit = 1 << index
+        if not self.blocked & bit:
+            return
+        self.blocked &= ~bit
+        for p in self.covering[index]:
+            self._blocks[p] -= 1
+            if not self._blocks[p]:
+                cells = self.placements[p]
+                self._adjust(cells, self.remaining[len(cells)])
+
+    def sink(self, mask: int, length: int):
+        """Blocks the cells of a sunk ship and removes one ship of its length from the count."""
+        for index in bits(mask):
+            self.block(index)
+        if self.remaining.get(length, 0) > 0:
+            self.remaining[length] -= 1
+            for p in self.spans[length]:
+                if not self._blocks[p]:
+                    self._adjust(self.placements[p], -1)
+
+    def peaks(self, exclude=0) -> list[int]:
+        """Returns the cells with the highest density, ignoring cells set in exclude."""
+        weights = np.array(self.weights)
+        weights[to_array(exclude, len(weights))] = -1
+        best = weights.max()
+        return np.flatnonzero(weights == best).tolist() if best >= 0 else []
+
+
+class ShipIndex:
+    """
+    The cells of every ship on a board, and those not fired at yet, per ship and per class of ship,
+    as bitboards. Updated by BoardState as ships are placed and their cells are fired at or cleared,
+    so the unchecked cells of a class of ship are found without scanning the board.
+    """
+    def __init__(self):
+        self.cells: dict[object, int] = {}  # Every cell of each ship
+        self.ships: dict[object, int] = {}  # Unchecked cells of each ship
+        self.classes: dict[type, int] = {}  # Unchecked cells of each class of ship
+
+    def of_ship(self, ship) -> int:
+        return self.ships.get(ship, 0)
+
+    def of_class(self, ship_class: type) -> int:
+        return self.classes.get(ship_class, 0)
+
+    def place(self, index: int, old, new, unchecked: bool):
+        """Moves the cell from the old ship to the new one. Either may be None."""
+        bit = 1 << index
+        if old is not None:
+            self.cells[old] &= ~bit
+            if not self.cells[old]:
+                del self.cells[old]
+            if unchecked:
+                self.check(index, old)
+        if new is not None:
+            self.cells[new] = self.cells.get(new, 0) | bit
+            if unchecked:
+                self.uncheck(index, new)
+
+    def check(self, index: int, ship):
+        bit = 1 << index
+        self.ships[ship] &= ~bit
+        self.classes[type(ship)] &= ~bit
+
+    def uncheck(self, index: int, ship):
+        bit = 1 << index
+        self.ships[ship] = self.ships.get(ship, 0) | bit
+        self.classes[type(ship)] = self.classes.get(type(ship), 0) | bit
+
+    def restore(self):
+        """Marks every cell of every ship unchecked."""
+        self.ships = dict(self.cells)
+        self.classes = {}
+        for ship, cells in self.cells.items():
+            self.classes[type(ship)] = self.classes.get(type(ship), 0) | cells
+
+    def reset(self):
+        self.cells.clear()
+        self.ships.clear()
+        self.classes.clear()
+
+
+class CellPool:
+    """Set of cells with constant-time add, discard and random choice."""
+    def __init__(self):
+        self._cells: list[int] = []
+        self._slots: dict[int, int] = {}
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __contains__(self, cell: int):
+        return cell in self._slots
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def add(self, cell: int):
+        if cell not in self._slots:
+            self._slots[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def discard(self, cell: int):
+        slot = self._slots.pop(cell, None)
+        if slot is None:
+            return
+        last = self._cells.pop()
+        if slot < len(self._cells):
+            self._cells[slot] = last
+            self._slots[last] = slot
+
+    def choice(self, rng: rd.Random) -> int:
+        return self._cells[rng.randrange(len(self._cells))]
+
+    def clear(self):
+        self._cells.clear()
+        self._slots.clear()
+
+
+class Frontier:
+    """
+    The unchecked cells next to open hits, i.e. hits on ships not yet sunk. Updated by BoardState
+    as hits land, ships sink and cells are cleared, so a follow-up shot does not search the board.
+    Each cell counts the open hits next to it and the lines of two open hits it would extend;
+    'aligned' holds the unchecked cells extending a line, 'adjacent' every unchecked cell next to an open hit.
+    Neighbors stop at the edge of the board.
+    """
+    def __init__(self, size: int):
+        self._neighbors = Geometry.for_size(size).bounded
+        self._cells = size * size
+        self.adjacent = CellPool()
+        self.aligned = CellPool()
+        self.reset()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(hits={self.hits.bit_count()}, adjacent={len(self.adjacent)}, ' \
+               f'aligned={len(self.aligned)})'
+
+    def reset(self):
+        self.hits = 0  # Open hits
+        self._adjacent = [0] * self._cells
+        self._aligned = [0] * self._cells
+        self.adjacent.clear()
+        self.aligned.clear()
+
+    def add(self, index: int, checked: int):
+        """Adds a new open hit. 'checked' is the mask of the cells fired at."""
+        self._update(index, 1, checked)
+        self.hits |= 1 << index
+
+    def remove(self, index: int):
+        """Removes an open hit, when its ship sinks or the hit is cleared."""
+        self.hits &= ~(1 << index)
+        self._update(index, -1)
+
+    def check(self, index: int):
+        self.adjacent.discard(index)
+        self.aligned.discard(index)
+
+    def uncheck(self, index: int):
+        if self._adjacent[index]:
+            self.adjacent.add(index)
+        if self._aligned[index]:
+            self.aligned.add(index)
+
+    def pick(self, rng: rd.Random, aligned=True) -> int:
+        """
+        Returns a random cell of the frontier, or None if it is empty.
+        With 'aligned', cells extending a line of hits are picked first, following the ship's orientation.
+        """
+        if aligned and self.aligned:
+            return self.aligned.choice(rng)
+        if self.adjacent:
+            return self.adjacent.choice(rng)
+
+    def _update(self, index: int, amount: int, checked=-1):
+        """Adds 'amount' to the counts of the cells around an open hit. Cells in 'checked' are not added to a pool."""
+        neighbors = self._neighbors
+        for direction, cell in enumerate(neighbors[index]):
+            if cell is None:
+                continue
+            self._count(self._adjacent, self.adjacent, cell, amount, checked)
+            if self.hits >> cell & 1:
+                # Two open hits in line: count the cells at both ends of the line.
+                for end in (neighbors[cell][direction], neighbors[index][direction ^ 2]):
+                    if end is not None:
+                        self._count(self._aligned, self.aligned, end, amount, checked)
+
+    @staticmethod
+    def _count(counts: list[int], pool: CellPool, cell: int, amount: int, checked: int):
+        counts[cell] += amount
+        if not counts[cell]:
+            pool.discard(cell)
+        elif amount > 0 and not checked >> cell & 1:
+            pool.add(cell)
@@ -3,6 +3,7 @@ import os.path
 import logging as lg
 import pygame as pg
 from enum import Enum
+from bsstate import bits
 
 
 class Align(Enum):
@@ -13,20 +14,58 @@ class Align(Enum):
         return self.name
 
 
+class Sprites:
+    """
+    Cache of the hull images. Each image file is loaded once, and every scaled and rotated variant
+    is kept, keyed by (ship type, square size, orientation).
+    """
+    HULLS: dict[str, pg.Surface] = {}
+    VARIANTS: dict[tuple[str, int, Align], pg.Surface] = {}
+
+    @classmethod
+    def hull(cls, image_file: str) -> pg.Surface:
+        image = cls.HULLS.get(image_file)
+        if image is None:
+            image = pg.image.load(image_file)
+            if pg.display.get_surface() is not None:
+                image = image.convert_alpha()
+            cls.HULLS[image_file] = image
+        return image
+
+    @classmethod
+    def get(cls, ship, sqr_size: int = None, align=Align.HORIZONTAL) -> pg.Surface:
+        """Returns the ship's hull image scaled to span its size in board squares, rotated to the alignment."""
+        key = (ship.type, sqr_size, align)
+        image = cls.VARIANTS.get(key)
+        if image is None:
+            if align is Align.VERTICAL:
+                image = pg.transform.rotate(cls.get(ship, sqr_size), -90)
+            elif sqr_size:
+                image = pg.transform.scale(cls.hull(ship.image_file), (sqr_size * ship.size + ship.size, sqr_size))
+            else:
+                image = cls.hull(ship.image_file)
+            cls.VARIANTS[key] = image
+        return image
+
+
 class Vessel:
     """
     This is the base class for the different vessel/ship types.
     Each ship type will have some specific attributes and a special skill.
     @DynamicAttrs
     """
-    def __init__(self):
+    def __init__(self, rng: rd.Random = None):
+        self.rng = rng if rng is not None else rd.Random()
         self._damage = 0
         self._position = []
         self.size = None
         self.name = ''
-        self._image_file = None
-        self.image = self._image_file
+        self.image_file = None
+        self.sqr_size = None  # Board square size the image is scaled to.
+        self.facing = Align.HORIZONTAL  # Alignment of the image.
         self._align = None
+        self._mask = 0  # Board cells of the position.
+        self.status: FleetStatus = None  # Fleet totals this ship reports to.
 
     def __repr__(self):
         return f'{self.type} ({self.name})'
@@ -35,13 +74,18 @@ class Vessel:
         if not self.sunk and len(position) == self.size:
             self._position = position
             self._align = Align.VERTICAL if position[0].x == position[1].x else Align.HORIZONTAL
+            self._mask = sum(1 << target.index for target in position)
             lg.debug(f'{self} deployed to {position}. (align={self.align})')
 
     def hit(self):
         if not self.sunk:
             self._damage += 1
+            if self.sunk and self.status is not None:
+                self.status.sink(self)
 
     def redeploy(self):
+        if self.sunk and self.status is not None:
+            self.status.refloat(self)
         self._damage = 0
         self._position.clear()
 
@@ -52,12 +96,18 @@ class Vessel:
     @damage.setter
     def damage(self, tot_dmg: int):
         if tot_dmg < self.size:
+            if self.sunk and self.status is not None:
+                self.status.refloat(self)
             self._damage = tot_dmg
         else:
             raise ValueError(f'{self} is already sunk.')
 
     # ----- Read-only properties -----
 
+    @property
+    def image(self) -> pg.Surface:
+        return Sprites.get(self, self.sqr_size, self.facing)
+
     @property
     def sunk(self) -> bool:
         return self._damage == self.size
@@ -66,6 +116,11 @@ class Vessel:
     def position(self) -> list:
         return self._position
 
+    @property
+    def mask(self) -> int:
+        """Bitboard of the cells the ship was last deployed to. See bsstate."""
+        return self._mask
+
     @property
     def type(self):
         return self.__class__.__name__
@@ -77,49 +132,107 @@ class Vessel:
 
 class Carrier(Vessel):
     """Base for Carrier-type vessels."""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, rng: rd.Random = None):
+        super().__init__(rng)
         self.size = 5
-        self.name = f'CV-{rd.randint(85, 200)}'
+        self.name = f'CV-{self.rng.randint(85, 200)}'
         self.image_file = os.path.join('Images', f'ShipCarrierHull.png')
-        self.image = pg.image.load(self.image_file)
 
 
 class Cruiser(Vessel):
     """Base for Cruiser-type vessels."""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, rng: rd.Random = None):
+        super().__init__(rng)
         self.size = 4
-        self.name = f'CG-{rd.randint(85, 200)}'
+        self.name = f'CG-{self.rng.randint(85, 200)}'
         self.image_file = os.path.join('Images', f'ShipCruiserHull.png')
-        self.image = pg.image.load(self.image_file)
 
 
 class Submarine(Vessel):
     """Base for Submarine-type vessels."""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, rng: rd.Random = None):
+        super().__init__(rng)
         self.size = 3
-        self.name = f'SS-{rd.randint(810, 1000)}'
+        self.name = f'SS-{self.rng.randint(810, 1000)}'
         self.image_file = os.path.join('Images', f'ShipSubMarineHull.png')
-        self.image = pg.image.load(self.image_file)
 
 
 class Destroyer(Vessel):
     """Base for Destroyer-type vessels."""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, rng: rd.Random = None):
+        super().__init__(rng)
         self.size = 3
-        self.name = f'DD-{rd.randint(1100, 1500)}'
+        self.name = f'DD-{self.rng.randint(1100, 1500)}'
         self.image_file = os.path.join('Images', f'ShipDestroyerHull.png')
-        self.image = pg.image.load(self.image_file)
 
 
 class Frigate(Vessel):
     """Base for Carrier-type vessels."""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, rng: rd.Random = None):
+        super().__init__(rng)
         self.size = 2
-        self.name = f'FF-{rd.randint(85, 200)}'
+        self.name = f'FF-{self.rng.randint(85, 200)}'
         self.image_file = os.path.join('Images', f'ShipFrigateHull.png')
-        self.image = pg.image.load(self.image_file)
+
+
+class FleetStatus:
+    """
+    Running totals of one player's fleet, kept as ships are hit, sunk and redeployed
+    and as their skills become ready, so that checking for the end of the game or
+    for ready skills does not scan the fleet.
+    Sunk ships and ready skills are masks with a bit per ship in fleet order.
+    """
+    def __init__(self, fleet=()):
+        self.ships: list[Vessel] = []
+        self.afloat = 0
+        self.sunk = 0
+        self._bits: dict[Vessel, int] = {}
+        self._skills = 0  # Ships whose skill can be activated, including sunk ships.
+        for ship in fleet:
+            self.add(ship)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.afloat}/{len(self.ships)} afloat)'
+
+    def add(self, ship: Vessel, ready=False):
+        bit = 1 << len(self.ships)
+        self.ships.append(ship)
+        self._bits[ship] = bit
+        ship.status = self
+        if ship.sunk:
+            self.sunk |= bit
+        else:
+            self.afloat += 1
+        self.set_ready(ship, ready)
+
+    def sink(self, ship: Vessel):
+        bit = self._bits[ship]
+        if not self.sunk & bit:
+            self.sunk |= bit
+            self.afloat -= 1
+
+    def refloat(self, ship: Vessel):
+        bit = self._bits[ship]
+        if self.sunk & bit:
+            self.sunk &= ~bit
+            self.afloat += 1
+
+    def set_ready(self, ship: Vessel, ready: bool):
+        if ready:
+            self._skills |= self._bits[ship]
+        else:
+            self._skills &= ~self._bits[ship]
+
+    def ready_ships(self) -> list[Vessel]:
+        """Ships afloat whose skill can be activated, in fleet order."""
+        return [self.ships[n] for n in bits(self.ready)]
+
+    # ----- Read-only properties -----
+
+    @property
+    def ready(self) -> int:
+        return self._skills & ~self.sunk
+
+    @property
+    def defeated(self) -> bool:
+        return not self.afloat
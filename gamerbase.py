@@ -1,7 +1,10 @@
 from enum import Enum, unique
 from collections import deque
+from functools import wraps
+import heapq
 import random as rd
 import logging as lg
+import json
 import time
 
 """
@@ -24,16 +27,116 @@ class Log:
 
     @staticmethod
     def call_log(f):
+        """Times each call of the function in the Profiler while it is enabled."""
+        name = f.__qualname__
+
+        @wraps(f)
         def call(*args, **kwargs):
-            lg.info(f'CALLED {f.__name__}, args={args}, kwargs={kwargs}\n')
+            if not Profiler.ENABLED:
+                return f(*args, **kwargs)
             start = time.perf_counter()
-            f_return = f(*args, **kwargs)
-            end = time.perf_counter()
-            lg.info(f'FINISHED {f.__name__}, RETURNED {f_return} [{round(end - start, 2)} second(s)]\n')
-            return f_return
+            try:
+                return f(*args, **kwargs)
+            finally:
+                Profiler.record(name, time.perf_counter() - start)
         return call
 
 
+class CallStats:
+    """
+    Call count and latency of one function.
+    Percentiles are estimated from a fixed-size uniform sample of the calls.
+    """
+    SAMPLE_SIZE = 1024
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self._samples = []
+        self._rng = rd.Random(name)  # Kept apart from the game's random numbers.
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        self.min = min(self.min, elapsed)
+        self.max = max(self.max, elapsed)
+        if len(self._samples) < self.SAMPLE_SIZE:
+            self._samples.append(elapsed)
+        else:
+            n = self._rng.randrange(self.count)
+            if n < self.SAMPLE_SIZE:
+                self._samples[n] = elapsed
+
+    def percentile(self, pct: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def as_dict(self) -> dict:
+        return {'count': self.count,
+                'total': self.total,
+                'mean': self.total / self.count if self.count else 0.0,
+                'min': self.min if self.count else 0.0,
+                'max': self.max,
+                'p95': self.percentile(95)
+                }
+
+
+class Profiler:
+    """
+    Registry of call timings for functions wrapped by Log.call_log.
+    Disabled by default; wrapped functions then only pay for one flag check.
+    """
+    ENABLED = False
+    STATS: dict[str, CallStats] = {}
+
+    @classmethod
+    def enable(cls, enabled=True):
+        cls.ENABLED = enabled
+
+    @classmethod
+    def disable(cls):
+        cls.ENABLED = False
+
+    @classmethod
+    def reset(cls):
+        cls.STATS.clear()
+
+    @classmethod
+    def record(cls, name: str, elapsed: float):
+        stats = cls.STATS.get(name)
+        if stats is None:
+            stats = cls.STATS[name] = CallStats(name)
+        stats.add(elapsed)
+
+    @classmethod
+    def as_dict(cls) -> dict:
+        """Timings in seconds, keyed by function name."""
+        return {name: stats.as_dict() for name, stats in sorted(cls.STATS.items())}
+
+    @classmethod
+    def to_json(cls, path=None) -> str:
+        data = json.dumps(cls.as_dict(), indent=2)
+        if path:
+            with open(path, 'w') as file:
+                file.write(data)
+        return data
+
+    @classmethod
+    def report(cls) -> str:
+        """Returns a table of the timings in microseconds, slowest total first."""
+        lines = [f'{"function":<32}{"calls":>9}{"total ms":>11}{"mean":>9}{"min":>9}{"max":>9}{"p95":>9}']
+        for name, stats in sorted(cls.STATS.items(), key=lambda item: -item[1].total):
+            data = stats.as_dict()
+            lines.append(f'{name:<32}{data["count"]:>9}{data["total"] * 1e3:>11.2f}'
+                         + ''.join(f'{data[key] * 1e6:>9.1f}' for key in ('mean', 'min', 'max', 'p95')))
+        return '\n'.join(lines)
+
+
 @unique
 class GameState(Enum):
     """
@@ -66,15 +169,19 @@ class GameFlow:
         self._state = init_state
         self._stack = init_stack
         self.queue = deque(init_stack)
+        self.skills = SkillScheduler()  # Cooldowns of the skills in this game, advanced as turns pass.
 
     @Log.call_log
     def progress_flow(self, start=None):
+        turn = self.turn
         if start is not None:
             self.continue_flow(start)
         else:
             self._state = self.queue.popleft()
             self.restack(self.state)
         self.TICKS += 1
+        if self.turn != turn:
+            self.skills.advance(self.turn)
 
     @Log.call_log
     def break_flow(self, set_state: GameState):
@@ -99,6 +206,7 @@ class GameFlow:
         self.queue = self.stack
         self._state = GameState.START if to_menu else GameState.SETUP
         self.TICKS = 0
+        self.skills.reset()
 
     @property
     def queue(self) -> deque:
@@ -123,6 +231,55 @@ class GameFlow:
         return self.TICKS // len(self.queue) + 1
 
 
+class Sequencer:
+    """
+    Runs queued actions at their scheduled times without blocking the game loop.
+    Actions run in the order queued; wait() delays every action queued after it.
+    In fast mode, actions run immediately and waits are skipped.
+    """
+    def __init__(self, fast=False):
+        self.fast = fast
+        self._queue = deque()  # (due time in ms, action)
+        self._cursor = 0.0
+
+    @staticmethod
+    def now() -> float:
+        return time.monotonic() * 1000
+
+    def then(self, action):
+        """Queues an action to run after everything queued before it."""
+        if self.fast:
+            action()
+        else:
+            self._cursor = max(self._cursor, self.now())
+            self._queue.append((self._cursor, action))
+
+    def wait(self, delay: float):
+        """Delays the actions queued next by 'delay' milliseconds."""
+        if not self.fast:
+            self._cursor = max(self._cursor, self.now()) + delay
+
+    def advance(self) -> int:
+        """Runs the actions that are due. Returns the number of actions run."""
+        now, count = self.now(), 0
+        while self._queue and self._queue[0][0] <= now:
+            _, action = self._queue.popleft()
+            action()
+            count += 1
+        return count
+
+    def skip(self):
+        """Runs every queued action now."""
+        while self._queue:
+            _, action = self._queue.popleft()
+            action()
+        self._cursor = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._queue) or self._cursor > self.now()
+
+
 class UserProfile:
     def __init__(self, username):
         self.name = username
@@ -138,8 +295,10 @@ class Player:
     COUNT = 0
     LIST = []
 
-    def __init__(self):
+    def __init__(self, rng: rd.Random = None):
         self.add_player(self)
+        # Random numbers of the game. Players and their boards, ships and skills share one per game.
+        self.rng = rng if rng is not None else rd.Random()
         self._name = self.__class__.__name__
         self._type = self.__class__.__name__
         self._level = 0
@@ -154,6 +313,11 @@ class Player:
         cls.COUNT += 1
         cls.LIST.append(new_player)
 
+    @classmethod
+    def remove_player(cls, player):
+        if player in cls.LIST:
+            cls.LIST.remove(player)
+
     def set_opponent(self, opponent):
         self.__setattr__('opp', opponent)
 
@@ -183,8 +347,8 @@ class Player:
 
 
 class Comp(Player):
-    def __init__(self, difficulty=2):
-        super().__init__()
+    def __init__(self, difficulty=2, rng: rd.Random = None):
+        super().__init__(rng)
         self._level = difficulty
 
 
@@ -201,58 +365,112 @@ class SkillType(Enum):
         return self.name
 
 
+class SkillScheduler:
+    """
+    Ends the cooldowns and durations of the skills in one game, keyed by the turn they end on.
+    Expirations are kept in a heap, so a turn only touches the skills that expire on it.
+    A skill rescheduled before its turn leaves its earlier entry behind; the skill ignores it.
+    """
+    def __init__(self, turn=1):
+        self.turn = turn
+        self._heap: list[tuple[int, int, GameSkill]] = []
+        self._count = 0  # Keeps skills expiring on the same turn in the order scheduled.
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(turn={self.turn}, scheduled={len(self._heap)})'
+
+    def schedule(self, skill, turns: int) -> int:
+        """Returns the turn 'turns' from now, on which the skill's expire() is called."""
+        turn = self.turn + turns
+        heapq.heappush(self._heap, (turn, self._count, skill))
+        self._count += 1
+        return turn
+
+    def advance(self, turn: int = None):
+        """Moves to the turn (by default the next one) and expires the skills due by then."""
+        self.turn = self.turn + 1 if turn is None else turn
+        heap = self._heap
+        while heap and heap[0][0] <= self.turn:
+            due, _, skill = heapq.heappop(heap)
+            skill.expire(due)
+
+    def reset(self, turn=1):
+        self.turn = turn
+        self._heap.clear()
+
+
 class GameSkill:
     """
     Provides a base to inherit for special skills in any game projects.
     Not sure if an abstract base class would be better.
+    Cooldowns and durations are counted in the turns of the skill's SkillScheduler.
     @DynamicAttrs
     """
-    COOLDOWN = []
-    ACTIVE = []
-
-    def __init__(self, name='', description='', cooldown=0, success_rate=100, duration=1):
+    def __init__(self, name='', description='', cooldown=0, success_rate=100, duration=1, rng: rd.Random = None,
+                 scheduler: SkillScheduler = None):
         self.func = None
+        self.rng = rng if rng is not None else rd.Random()
+        self.scheduler = scheduler if scheduler is not None else SkillScheduler()
         self._name = name
         self._description = description
         self._success_rate = success_rate
         self._cooldown = cooldown
         self._duration = duration
 
-        self._downtime = 0
-        self._uptime = 0
+        self._downtime = 0  # -1 while disabled. See 'downtime' for cooldowns.
+        self._ready_turn = None  # Turn the cooldown ends.
+        self._active_until = None  # Turn the duration ends.
         self._stacks = 0
 
+        # Usage statistics
+        self.attempts = 0
+        self.activations = 0
+
     def __repr__(self):
         return self._name
 
-    @classmethod
-    def turnover(cls):
-        for skill in cls.COOLDOWN:
-            skill.downtime -= 1
-            if skill.downtime <= 0:
-                cls.COOLDOWN.remove(skill)
-
-        for skill in cls.ACTIVE:
-            skill.uptime -= 1
-            if not skill.uptime:
-                cls.ACTIVE.remove(skill)
-
     def activate(self, *args, **kwargs):
+        self.attempts += 1
         if self.roll_success():
+            self.activations += 1
             self.uptime = self._duration
             self.downtime = self._cooldown
-            GameSkill.COOLDOWN.append(self)
+            self.on_activate(*args, **kwargs)
             self.func(*args, **kwargs)
 
+    def on_activate(self, *args, **kwargs):
+        """Called with the arguments of 'func' just before a successful activation executes it."""
+
     def roll_success(self, chance=0) -> bool:
         if chance:
-            return chance >= rd.randint(1, 100)
+            return chance >= self.rng.randint(1, 100)
         else:
-            return self.success_rate >= rd.randint(1, 100)
+            return self.success_rate >= self.rng.randint(1, 100)
 
     def disable_ready(self):
         """Prevents 'ready' property from returning True."""
-        self._downtime = -1
+        self._set_downtime(-1)
+
+    def _set_downtime(self, downtime: int):
+        ready = self.ready
+        if downtime > 0:
+            self._downtime = 0
+            self._ready_turn = self.scheduler.schedule(self, downtime)
+        else:
+            self._downtime = downtime
+            self._ready_turn = None
+        if self.ready != ready:
+            self._ready_changed()
+
+    def expire(self, turn: int):
+        """Called by the scheduler on a turn the skill was scheduled for."""
+        if turn == self._ready_turn:
+            self._set_downtime(0)
+        if turn == self._active_until:
+            self._active_until = None
+
+    def _ready_changed(self):
+        """Called whenever the 'ready' property changes. Overridden to keep track of ready skills."""
 
     def disable_activate(self):
         """Prevents execution of the 'activate' method."""
@@ -260,21 +478,27 @@ class GameSkill:
 
     @property
     def downtime(self) -> int:
+        if self._ready_turn is not None:
+            return self._ready_turn - self.scheduler.turn
         return self._downtime
 
     @downtime.setter
     def downtime(self, new_val):
         if new_val >= 0:
-            self._downtime = new_val
+            self._set_downtime(new_val)
 
     @property
     def uptime(self) -> int:
-        return self._uptime
+        if self._active_until is not None:
+            return self._active_until - self.scheduler.turn
+        return 0
 
     @uptime.setter
     def uptime(self, new_val):
-        if new_val >= 0:
-            self._uptime = new_val
+        if new_val > 0:
+            self._active_until = self.scheduler.schedule(self, new_val)
+        elif new_val == 0:
+            self._active_until = None
 
     @property
     def stacks(self) -> int:
@@ -289,11 +513,11 @@ class GameSkill:
 
     @property
     def active(self) -> bool:
-        return bool(self._uptime)
+        return self._active_until is not None
 
     @property
     def ready(self) -> bool:
-        return not self._downtime
+        return not self._downtime and self._ready_turn is None
 
     @property
     def name(self) -> str: